@@ -9,9 +9,17 @@ import logging
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (pool sized for bursty dashboard loads, wire compression
+# negotiated with the server and used when available)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', '200')),
+    minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', '20')),
+    maxIdleTimeMS=30000,
+    waitQueueTimeoutMS=2000,
+    compressors="zstd,zlib"
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -31,6 +39,7 @@ SMTP_VERIFY_SSL = os.environ.get('SMTP_VERIFY_SSL', 'true').lower() == 'true'
 # App Configuration
 APP_NAME = os.environ.get('APP_NAME', 'Earthly Life')
 APP_URL = os.environ.get('APP_URL', 'http://localhost:3000')
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
 
 # Uploads directory
 UPLOADS_DIR = ROOT_DIR / "uploads"
@@ -21,4 +21,4 @@ if [ -n "$CRON_SCHEDULE" ]; then
 fi
 
 # Start the FastAPI application
-exec uvicorn server:app --host 0.0.0.0 --port 8001
+exec uvicorn server:app --host 0.0.0.0 --port 8001 --loop uvloop --http httptools
@@ -17,7 +17,7 @@ from .library import (
 )
 from .task import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
 from .routine import (
-    RoutineTaskCreate, RoutineTaskUpdate, RoutineTaskResponse,
+    RoutineType, RoutineTaskCreate, RoutineTaskUpdate, RoutineTaskResponse,
     RoutineCompletionResponse, RoutineListResponse
 )
 from .public import PublicUserProfileResponse
@@ -62,7 +62,7 @@ __all__ = [
     # Task
     "TaskCreate", "TaskUpdate", "TaskResponse", "TaskListResponse",
     # Routine
-    "RoutineTaskCreate", "RoutineTaskUpdate", "RoutineTaskResponse",
+    "RoutineType", "RoutineTaskCreate", "RoutineTaskUpdate", "RoutineTaskResponse",
     "RoutineCompletionResponse", "RoutineListResponse",
     # Public
     "PublicUserProfileResponse",
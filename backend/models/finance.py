@@ -122,7 +122,8 @@ class TransactionResponse(BaseModel):
 
 class TransactionListResponse(BaseModel):
     transactions: List[TransactionResponse]
-    total: int
+    total: Optional[int] = None  # None when count=false and more pages follow
+    has_more: bool = False
 
 
 # Recurring Transaction models
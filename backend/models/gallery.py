@@ -42,3 +42,4 @@ class GalleryListResponse(BaseModel):
 class PublicGalleryResponse(BaseModel):
     folders: List[GalleryFolderResponse]
     images: List[GalleryImageResponse]
+    has_more: bool = False
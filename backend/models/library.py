@@ -51,3 +51,4 @@ class LibraryEntryResponse(BaseModel):
 class LibraryListResponse(BaseModel):
     folders: List[LibraryFolderResponse]
     entries: List[LibraryEntryResponse]
+    has_more: bool = False
@@ -1,6 +1,12 @@
 """Routine related Pydantic models."""
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from enum import Enum
+
+
+class RoutineType(str, Enum):
+    startup = "startup"
+    shutdown = "shutdown"
 
 
 class RoutineTaskCreate(BaseModel):
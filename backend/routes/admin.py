@@ -80,7 +80,7 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
 @router.post("/seed/admin", response_model=MessageResponse)
 async def seed_admin():
     """Create initial admin user if none exists"""
-    admin_exists = await db.users.find_one({"is_admin": True})
+    admin_exists = await db.users.find_one({"is_admin": True}, {"_id": 1})
     if admin_exists:
         raise HTTPException(status_code=400, detail="Admin user already exists")
     
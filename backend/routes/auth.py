@@ -49,7 +49,8 @@ async def forgot_password(data: ForgotPasswordRequest):
         return MessageResponse(message="If the email exists, a reset link has been sent")
     
     reset_token = secrets.token_urlsafe(32)
-    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=1)
     
     await db.password_resets.insert_one({
         "id": str(uuid.uuid4()),
@@ -57,7 +58,7 @@ async def forgot_password(data: ForgotPasswordRequest):
         "token": reset_token,
         "expires_at": expires_at.isoformat(),
         "used": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now.isoformat()
     })
     
     reset_url = f"{APP_URL}/reset-password?token={reset_token}"
@@ -83,14 +84,15 @@ async def reset_password(data: ResetPasswordRequest):
     if not reset_record:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
+    now = datetime.now(timezone.utc)
     expires_at = datetime.fromisoformat(reset_record["expires_at"])
-    if datetime.now(timezone.utc) > expires_at:
+    if now > expires_at:
         raise HTTPException(status_code=400, detail="Reset token has expired")
     
     hashed_password = hash_password(data.new_password)
     await db.users.update_one(
         {"id": reset_record["user_id"]},
-        {"$set": {"password": hashed_password, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"password": hashed_password, "updated_at": now.isoformat()}}
     )
     
     await db.password_resets.update_one(
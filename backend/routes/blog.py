@@ -2,11 +2,15 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from typing import Optional, List
 from datetime import datetime, timezone
+from collections import defaultdict
+import asyncio
 import uuid
 
+import aiofiles
+
 from config import db, UPLOADS_DIR, MAX_UPLOAD_SIZE, MAX_UPLOAD_SIZE_MB
 from models import BlogEntryCreate, BlogEntryUpdate, BlogEntryResponse, BlogListResponse, BlogImageResponse, MessageResponse
-from services import get_current_user, verify_project_access
+from services import get_current_user, verify_project_access, search_regex
 
 router = APIRouter()
 
@@ -17,9 +21,10 @@ async def get_blog_images(blog_id: str) -> List[dict]:
     return images
 
 
-async def build_blog_response(entry: dict) -> BlogEntryResponse:
-    """Build a blog entry response with images"""
-    images = await get_blog_images(entry["id"])
+async def build_blog_response(entry: dict, images: Optional[List[dict]] = None) -> BlogEntryResponse:
+    """Build a blog entry response with images, fetching them unless already given"""
+    if images is None:
+        images = await get_blog_images(entry["id"])
     return BlogEntryResponse(
         id=entry["id"],
         project_id=entry["project_id"],
@@ -71,19 +76,29 @@ async def list_blog_entries(
     
     query = {"project_id": project_id}
     if search:
+        search_filter = search_regex(search)
         query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+            {"title": search_filter},
+            {"description": search_filter}
         ]
     
     sort_direction = -1 if sort_order == "desc" else 1
-    total = await db.blog_entries.count_documents(query)
-    entries = await db.blog_entries.find(query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
+    total, entries = await asyncio.gather(
+        db.blog_entries.count_documents(query),
+        db.blog_entries.find(query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
+    )
+    
+    # Fetch the images of all entries in one query and group them per entry
+    images_by_blog = defaultdict(list)
+    if entries:
+        images = await db.blog_images.find(
+            {"blog_id": {"$in": [e["id"] for e in entries]}},
+            {"_id": 0}
+        ).to_list(None)
+        for img in images:
+            images_by_blog[img["blog_id"]].append(img)
     
-    # Build responses with images
-    responses = []
-    for entry in entries:
-        responses.append(await build_blog_response(entry))
+    responses = [await build_blog_response(entry, images_by_blog[entry["id"]]) for entry in entries]
     
     return BlogListResponse(entries=responses, total=total)
 
@@ -137,11 +152,11 @@ async def delete_blog_entry(
         raise HTTPException(status_code=404, detail="Blog entry not found")
     
     # Delete associated images from disk
-    images = await db.blog_images.find({"blog_id": entry_id}).to_list(100)
-    for img in images:
-        img_path = UPLOADS_DIR / img["url"].split("/uploads/")[-1]
-        if img_path.exists():
-            img_path.unlink()
+    images = await db.blog_images.find({"blog_id": entry_id}, {"_id": 0, "url": 1}).to_list(None)
+    await asyncio.gather(*(
+        asyncio.to_thread((UPLOADS_DIR / img["url"].split("/uploads/")[-1]).unlink, missing_ok=True)
+        for img in images
+    ))
     
     # Delete images from database
     await db.blog_images.delete_many({"blog_id": entry_id})
@@ -173,29 +188,34 @@ async def upload_blog_image(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Invalid file type. Allowed: JPEG, PNG, GIF, WEBP")
     
-    # Check file size
-    content = await file.read()
-    if len(content) > MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=413, 
-            detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB}MB"
-        )
-    
     image_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
     # Create blog images directory
     blog_dir = UPLOADS_DIR / "blog" / project_id / entry_id
-    blog_dir.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(blog_dir.mkdir, parents=True, exist_ok=True)
     
     # Save file
     file_ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
     filename = f"{image_id}.{file_ext}"
     file_path = blog_dir / filename
     
-    # content already read for size check
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Stream to disk in chunks, checking the size as we go
+    total = 0
+    too_large = False
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(1 << 20):
+            total += len(chunk)
+            if total > MAX_UPLOAD_SIZE:
+                too_large = True
+                break
+            await f.write(chunk)
+    if too_large:
+        await asyncio.to_thread(file_path.unlink, missing_ok=True)
+        raise HTTPException(
+            status_code=413, 
+            detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB}MB"
+        )
     
     # Save to database
     image_doc = {
@@ -208,8 +228,9 @@ async def upload_blog_image(
     }
     
     await db.blog_images.insert_one(image_doc)
+    image_doc.pop("_id", None)
     
-    return BlogImageResponse(**{k: v for k, v in image_doc.items() if k != "_id"})
+    return BlogImageResponse(**image_doc)
 
 
 @router.delete("/projects/{project_id}/blog/{entry_id}/images/{image_id}", response_model=MessageResponse)
@@ -233,8 +254,7 @@ async def delete_blog_image(
     
     # Delete file from disk
     img_path = UPLOADS_DIR / image["url"].split("/uploads/")[-1]
-    if img_path.exists():
-        img_path.unlink()
+    await asyncio.to_thread(img_path.unlink, missing_ok=True)
     
     # Delete from database
     await db.blog_images.delete_one({"id": image_id})
@@ -51,9 +51,10 @@ async def create_expense_period(data: ExpensePeriodCreate, current_user: dict =
     }
     
     await db.expense_periods.insert_one(period_doc)
+    period_doc.pop("_id", None)
     
     return ExpensePeriodResponse(
-        **{k: v for k, v in period_doc.items() if k != "_id"},
+        **period_doc,
         project_name=project["name"],
         expected_items_count=0,
         total_monthly_income=0.0,
@@ -250,11 +251,12 @@ async def create_expected_item(data: ExpectedItemCreate, current_user: dict = De
     }
     
     await db.expected_items.insert_one(item_doc)
+    item_doc.pop("_id", None)
     
     project = await db.projects.find_one({"id": period["project_id"]}, {"_id": 0, "name": 1})
     
     return ExpectedItemResponse(
-        **{k: v for k, v in item_doc.items() if k != "_id"},
+        **item_doc,
         period_name=period["name"],
         project_name=project["name"] if project else None,
         category_name=category["name"] if category else None
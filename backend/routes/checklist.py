@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional, List
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
 import uuid
 
 from config import db
@@ -15,6 +16,11 @@ from services import get_current_user
 router = APIRouter()
 
 
+def latest_update(checklist: dict, item_timestamps) -> str:
+    """Item mutations don't touch the checklist, so its updated_at is the newest of both"""
+    return max([checklist["updated_at"], *item_timestamps])
+
+
 # ============ CHECKLISTS ============
 
 @router.post("/checklists", response_model=ChecklistResponse)
@@ -32,8 +38,10 @@ async def create_checklist(data: ChecklistCreate, current_user: dict = Depends(g
         "id": checklist_id,
         "user_id": current_user["id"],
         "project_id": data.project_id,
+        "project_name": project["name"],
         "name": data.name,
         "description": data.description,
+        "next_order": 0,
         "created_at": now,
         "updated_at": now
     }
@@ -57,19 +65,44 @@ async def create_checklist(data: ChecklistCreate, current_user: dict = Depends(g
 @router.get("/checklists", response_model=ChecklistListResponse)
 async def list_checklists(
     project_id: Optional[str] = None,
+    include_items: bool = True,
     current_user: dict = Depends(get_current_user)
 ):
-    """List all checklists, optionally filtered by project."""
+    """List all checklists, optionally filtered by project.
+    
+    With include_items=false only the item counts are returned, computed
+    server-side in a single aggregation instead of loading every item.
+    """
     query = {"user_id": current_user["id"]}
     if project_id:
         query["project_id"] = project_id
     
     checklists = await db.checklists.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
     
+    if not include_items:
+        counts = await db.checklist_items.aggregate([
+            {"$match": {"checklist_id": {"$in": [c["id"] for c in checklists]}}},
+            {"$group": {
+                "_id": "$checklist_id",
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": ["$is_done", 1, 0]}},
+                "updated_at": {"$max": "$updated_at"}
+            }}
+        ]).to_list(1000)
+        count_map = {c["_id"]: c for c in counts}
+    
     result = []
     for checklist in checklists:
-        # Get project name
-        project = await db.projects.find_one({"id": checklist["project_id"]}, {"_id": 0, "name": 1})
+        if not include_items:
+            item_counts = count_map.get(checklist["id"], {})
+            if item_counts.get("updated_at"):
+                checklist["updated_at"] = latest_update(checklist, [item_counts["updated_at"]])
+            result.append(ChecklistResponse.model_construct(
+                **checklist,
+                total_items=item_counts.get("total", 0),
+                completed_items=item_counts.get("completed", 0)
+            ))
+            continue
         
         # Get items for this checklist
         items = await db.checklist_items.find(
@@ -77,13 +110,14 @@ async def list_checklists(
             {"_id": 0}
         ).sort("order", 1).to_list(1000)
         
-        item_responses = [ChecklistItemResponse(**item) for item in items]
+        # model_construct skips validating each item on the way in; response_model still validates the output
+        item_responses = [ChecklistItemResponse.model_construct(**item) for item in items]
         total_items = len(items)
         completed_items = sum(1 for item in items if item.get("is_done", False))
+        checklist["updated_at"] = latest_update(checklist, (item["updated_at"] for item in items))
         
-        result.append(ChecklistResponse(
+        result.append(ChecklistResponse.model_construct(
             **checklist,
-            project_name=project["name"] if project else None,
             items=item_responses,
             total_items=total_items,
             completed_items=completed_items
@@ -102,22 +136,19 @@ async def get_checklist(checklist_id: str, current_user: dict = Depends(get_curr
     if not checklist:
         raise HTTPException(status_code=404, detail="Checklist not found")
     
-    # Get project name
-    project = await db.projects.find_one({"id": checklist["project_id"]}, {"_id": 0, "name": 1})
-    
     # Get items
     items = await db.checklist_items.find(
         {"checklist_id": checklist_id},
         {"_id": 0}
     ).sort("order", 1).to_list(1000)
     
-    item_responses = [ChecklistItemResponse(**item) for item in items]
+    item_responses = [ChecklistItemResponse.model_construct(**item) for item in items]
     total_items = len(items)
     completed_items = sum(1 for item in items if item.get("is_done", False))
+    checklist["updated_at"] = latest_update(checklist, (item["updated_at"] for item in items))
     
     return ChecklistResponse(
         **checklist,
-        project_name=project["name"] if project else None,
         items=item_responses,
         total_items=total_items,
         completed_items=completed_items
@@ -131,7 +162,7 @@ async def update_checklist(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a checklist."""
-    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]})
+    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not checklist:
         raise HTTPException(status_code=404, detail="Checklist not found")
     
@@ -146,7 +177,7 @@ async def update_checklist(
 @router.delete("/checklists/{checklist_id}", response_model=MessageResponse)
 async def delete_checklist(checklist_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a checklist and all its items."""
-    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]})
+    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not checklist:
         raise HTTPException(status_code=404, detail="Checklist not found")
     
@@ -162,7 +193,7 @@ async def delete_checklist(checklist_id: str, current_user: dict = Depends(get_c
 @router.post("/checklists/{checklist_id}/reset", response_model=ChecklistResponse)
 async def reset_checklist(checklist_id: str, current_user: dict = Depends(get_current_user)):
     """Reset all items in a checklist to not done."""
-    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]})
+    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not checklist:
         raise HTTPException(status_code=404, detail="Checklist not found")
     
@@ -192,24 +223,32 @@ async def create_checklist_item(
     current_user: dict = Depends(get_current_user)
 ):
     """Add an item to a checklist."""
-    checklist = await db.checklists.find_one({"id": checklist_id, "user_id": current_user["id"]})
+    now = datetime.now(timezone.utc).isoformat()
+    
+    # Check ownership and reserve the next order slot atomically; an explicit
+    # order only moves the counter forward so later appends land after it
+    if data.order == 0:
+        counter_update = {"$inc": {"next_order": 1}}
+    else:
+        counter_update = {"$max": {"next_order": data.order}}
+    checklist = await db.checklists.find_one_and_update(
+        {"id": checklist_id, "user_id": current_user["id"]},
+        {**counter_update, "$set": {"updated_at": now}},
+        projection={"_id": 0, "next_order": 1},
+        return_document=ReturnDocument.AFTER
+    )
     if not checklist:
         raise HTTPException(status_code=404, detail="Checklist not found")
     
-    # Get max order if not specified
     if data.order == 0:
-        max_order_item = await db.checklist_items.find_one(
-            {"checklist_id": checklist_id},
-            sort=[("order", -1)]
-        )
-        data.order = (max_order_item["order"] + 1) if max_order_item else 1
+        data.order = checklist["next_order"]
     
     item_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
     
     item_doc = {
         "id": item_id,
         "checklist_id": checklist_id,
+        "user_id": current_user["id"],
         "text": data.text,
         "is_done": False,
         "order": data.order,
@@ -219,12 +258,6 @@ async def create_checklist_item(
     
     await db.checklist_items.insert_one(item_doc)
     
-    # Update checklist timestamp
-    await db.checklists.update_one(
-        {"id": checklist_id},
-        {"$set": {"updated_at": now}}
-    )
-    
     return ChecklistItemResponse(**item_doc)
 
 
@@ -235,39 +268,33 @@ async def update_checklist_item(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a checklist item (text, done status, order)."""
-    item = await db.checklist_items.find_one({"id": item_id})
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Verify ownership through checklist
-    checklist = await db.checklists.find_one({"id": item["checklist_id"], "user_id": current_user["id"]})
-    if not checklist:
-        raise HTTPException(status_code=404, detail="Checklist not found")
-    
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.checklist_items.update_one({"id": item_id}, {"$set": update_data})
+    # Ownership is checked via the user_id denormalized onto the item
+    updated = await db.checklist_items.find_one_and_update(
+        {"id": item_id, "user_id": current_user["id"]},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Item not found")
     
-    updated = await db.checklist_items.find_one({"id": item_id}, {"_id": 0})
     return ChecklistItemResponse(**updated)
 
 
 @router.delete("/checklist-items/{item_id}", response_model=MessageResponse)
 async def delete_checklist_item(item_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a checklist item."""
-    item = await db.checklist_items.find_one({"id": item_id})
+    item = await db.checklist_items.find_one_and_delete(
+        {"id": item_id, "user_id": current_user["id"]},
+        projection={"_id": 0, "checklist_id": 1}
+    )
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    # Verify ownership through checklist
-    checklist = await db.checklists.find_one({"id": item["checklist_id"], "user_id": current_user["id"]})
-    if not checklist:
-        raise HTTPException(status_code=404, detail="Checklist not found")
-    
-    await db.checklist_items.delete_one({"id": item_id})
-    
-    # Update checklist timestamp
+    # A deleted item leaves no timestamp behind, so record it on the checklist
     await db.checklists.update_one(
         {"id": item["checklist_id"]},
         {"$set": {"updated_at": datetime.now(timezone.utc).isoformat()}}
@@ -279,22 +306,16 @@ async def delete_checklist_item(item_id: str, current_user: dict = Depends(get_c
 @router.post("/checklist-items/{item_id}/toggle", response_model=ChecklistItemResponse)
 async def toggle_checklist_item(item_id: str, current_user: dict = Depends(get_current_user)):
     """Toggle the done status of a checklist item."""
-    item = await db.checklist_items.find_one({"id": item_id})
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Verify ownership through checklist
-    checklist = await db.checklists.find_one({"id": item["checklist_id"], "user_id": current_user["id"]})
-    if not checklist:
-        raise HTTPException(status_code=404, detail="Checklist not found")
-    
     now = datetime.now(timezone.utc).isoformat()
-    new_status = not item.get("is_done", False)
     
-    await db.checklist_items.update_one(
-        {"id": item_id},
-        {"$set": {"is_done": new_status, "updated_at": now}}
+    # Flip is_done server-side with an update pipeline so no prior read is needed
+    updated = await db.checklist_items.find_one_and_update(
+        {"id": item_id, "user_id": current_user["id"]},
+        [{"$set": {"is_done": {"$not": [{"$ifNull": ["$is_done", False]}]}, "updated_at": now}}],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Item not found")
     
-    updated = await db.checklist_items.find_one({"id": item_id}, {"_id": 0})
     return ChecklistItemResponse(**updated)
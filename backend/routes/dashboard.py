@@ -14,6 +14,42 @@ class DashboardData:
     pass
 
 
+def project_lookup(collection: str, match: dict, sort: dict, extra_stages: list = ()) -> list:
+    """Facet stages joining the user's projects to their documents in another collection"""
+    return [
+        {"$lookup": {
+            "from": collection,
+            "let": {"pid": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$project_id", "$$pid"]}, **match}},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "docs"
+        }},
+        {"$unwind": "$docs"},
+        {"$replaceRoot": {"newRoot": "$docs"}},
+        *extra_stages,
+        {"$sort": sort}
+    ]
+
+
+def not_completed_on(date: str) -> list:
+    """Stages dropping routine tasks that already have a completion for the given date"""
+    return [
+        {"$lookup": {
+            "from": "routine_completions",
+            "let": {"tid": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$task_id", "$$tid"]}, "completed_date": date}},
+                {"$limit": 1}
+            ],
+            "as": "completion"
+        }},
+        {"$match": {"completion": {"$size": 0}}},
+        {"$project": {"completion": 0}}
+    ]
+
+
 @router.get("/data")
 async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
     """Get dashboard data including today's tasks and incomplete routines"""
@@ -22,54 +58,32 @@ async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
     today_start = f"{today}T00:00:00"
     today_end = f"{today}T23:59:59"
     
-    # Get user's projects
-    projects = await db.projects.find({"user_id": user_id}, {"_id": 0}).to_list(1000)
-    project_ids = [p["id"] for p in projects]
-    
-    # Get today's tasks from all projects
-    tasks = await db.tasks.find({
-        "project_id": {"$in": project_ids},
-        "task_datetime": {"$gte": today_start, "$lte": today_end}
-    }, {"_id": 0}).sort("task_datetime", 1).to_list(1000)
-    
-    # Get all routine tasks
-    startup_tasks = await db.routine_tasks.find({
-        "project_id": {"$in": project_ids},
-        "routine_type": "startup"
-    }, {"_id": 0}).sort("order", 1).to_list(1000)
-    
-    shutdown_tasks = await db.routine_tasks.find({
-        "project_id": {"$in": project_ids},
-        "routine_type": "shutdown"
-    }, {"_id": 0}).sort("order", 1).to_list(1000)
-    
-    # Get today's completions
-    completions = await db.routine_completions.find({
-        "completed_date": today
-    }, {"_id": 0}).to_list(1000)
-    completed_task_ids = [c["task_id"] for c in completions]
-    
-    # Filter to incomplete tasks
-    incomplete_startup = [t for t in startup_tasks if t["id"] not in completed_task_ids]
-    incomplete_shutdown = [t for t in shutdown_tasks if t["id"] not in completed_task_ids]
-    
-    # Map tasks to their projects
-    project_map = {p["id"]: p["name"] for p in projects}
-    
-    for task in tasks:
-        task["project_name"] = project_map.get(task["project_id"], "Unknown")
-    
-    for task in incomplete_startup:
-        task["project_name"] = project_map.get(task["project_id"], "Unknown")
-    
-    for task in incomplete_shutdown:
-        task["project_name"] = project_map.get(task["project_id"], "Unknown")
+    # Fetch projects, today's tasks and incomplete routines in a single round trip
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$project": {"_id": 0, "id": 1}},
+        {"$facet": {
+            "projects": [{"$count": "total"}],
+            "tasks": project_lookup(
+                "tasks", {"task_datetime": {"$gte": today_start, "$lte": today_end}}, {"task_datetime": 1}
+            ),
+            "startup_tasks": project_lookup(
+                "routine_tasks", {"routine_type": "startup"}, {"order": 1}, not_completed_on(today)
+            ),
+            "shutdown_tasks": project_lookup(
+                "routine_tasks", {"routine_type": "shutdown"}, {"order": 1}, not_completed_on(today)
+            )
+        }}
+    ]
+    result = (await db.projects.aggregate(pipeline).to_list(1))[0]
+    
+    projects_count = result["projects"][0]["total"] if result["projects"] else 0
     
     return {
-        "today_tasks": tasks,
-        "incomplete_startup_tasks": incomplete_startup,
-        "incomplete_shutdown_tasks": incomplete_shutdown,
-        "projects_count": len(projects),
+        "today_tasks": result["tasks"],
+        "incomplete_startup_tasks": result["startup_tasks"],
+        "incomplete_shutdown_tasks": result["shutdown_tasks"],
+        "projects_count": projects_count,
         "date": today
     }
 
@@ -83,9 +97,8 @@ async def get_all_user_tasks(
     """Get all tasks across all user's projects for calendar view"""
     user_id = current_user["id"]
     
-    projects = await db.projects.find({"user_id": user_id}, {"_id": 0, "id": 1, "name": 1}).to_list(1000)
+    projects = await db.projects.find({"user_id": user_id}, {"_id": 0, "id": 1}).to_list(1000)
     project_ids = [p["id"] for p in projects]
-    project_map = {p["id"]: p["name"] for p in projects}
     
     query = {"project_id": {"$in": project_ids}}
     
@@ -94,7 +107,4 @@ async def get_all_user_tasks(
     
     tasks = await db.tasks.find(query, {"_id": 0}).sort("task_datetime", 1).to_list(1000)
     
-    for task in tasks:
-        task["project_name"] = project_map.get(task["project_id"], "Unknown")
-    
     return {"tasks": tasks, "total": len(tasks)}
@@ -6,7 +6,7 @@ import uuid
 
 from config import db
 from models import DiaryEntryCreate, DiaryEntryUpdate, DiaryEntryResponse, DiaryListResponse, MessageResponse
-from services import get_current_user, verify_project_access
+from services import get_current_user, verify_project_access, search_regex
 
 router = APIRouter()
 
@@ -34,7 +34,8 @@ async def create_diary_entry(
     }
     
     await db.diary_entries.insert_one(entry_doc)
-    return DiaryEntryResponse(**{k: v for k, v in entry_doc.items() if k != "_id"})
+    entry_doc.pop("_id", None)
+    return DiaryEntryResponse(**entry_doc)
 
 
 @router.get("/projects/{project_id}/diary", response_model=DiaryListResponse)
@@ -49,16 +50,18 @@ async def list_diary_entries(
     
     query = {"project_id": project_id}
     if search:
+        search_filter = search_regex(search)
         query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"story": {"$regex": search, "$options": "i"}}
+            {"title": search_filter},
+            {"story": search_filter}
         ]
     
     sort_direction = -1 if sort_order == "desc" else 1
     total = await db.diary_entries.count_documents(query)
     entries = await db.diary_entries.find(query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
     
-    return DiaryListResponse(entries=[DiaryEntryResponse(**e) for e in entries], total=total)
+    # Built without input validation; FastAPI's response_model check is the only validation pass left
+    return DiaryListResponse(entries=[DiaryEntryResponse.model_construct(**e) for e in entries], total=total)
 
 
 @router.get("/projects/{project_id}/diary/{entry_id}", response_model=DiaryEntryResponse)
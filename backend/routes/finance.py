@@ -3,10 +3,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional, List
 from datetime import datetime, timezone
 from dateutil.relativedelta import relativedelta
+from functools import lru_cache
+from pymongo import InsertOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import asyncio
 import uuid
 
 from config import db
 from models import (
+    AccountType, CategoryType,
     AccountCreate, AccountUpdate, AccountResponse, AccountListResponse,
     CategoryCreate, CategoryUpdate, CategoryResponse, CategoryListResponse,
     TransactionCreate, TransactionUpdate, TransactionResponse, TransactionListResponse,
@@ -17,6 +22,11 @@ from services import get_current_user
 
 router = APIRouter()
 
+ACCOUNT_FIELDS = {
+    "_id": 0, "id": 1, "project_id": 1, "name": 1, "type": 1,
+    "starting_balance": 1, "notes": 1, "created_at": 1, "updated_at": 1
+}
+
 
 # ============ ACCOUNTS ============
 
@@ -24,7 +34,7 @@ router = APIRouter()
 async def create_account(data: AccountCreate, current_user: dict = Depends(get_current_user)):
     """Create a new financial account for a project"""
     # Verify project access
-    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]})
+    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -44,8 +54,9 @@ async def create_account(data: AccountCreate, current_user: dict = Depends(get_c
     }
     
     await db.finance_accounts.insert_one(account_doc)
+    account_doc.pop("_id", None)
     
-    return AccountResponse(**{k: v for k, v in account_doc.items() if k != "_id"}, balance=data.starting_balance)
+    return AccountResponse(**account_doc, balance=data.starting_balance)
 
 
 @router.get("/accounts", response_model=AccountListResponse)
@@ -58,14 +69,16 @@ async def list_accounts(
     if project_id:
         query["project_id"] = project_id
     
-    accounts = await db.finance_accounts.find(query, {"_id": 0}).to_list(1000)
+    # Project exactly the covering index fields so no documents are fetched
+    accounts = await db.finance_accounts.find(query, ACCOUNT_FIELDS).to_list(1000)
     
     # Calculate balance for each account
-    result = []
-    for acc in accounts:
-        starting_balance = acc.get("starting_balance", 0.0)
-        balance = await calculate_account_balance(acc["id"], starting_balance)
-        result.append(AccountResponse(**acc, balance=balance))
+    balances = await calculate_account_balances(accounts, current_user["id"])
+    # Constructed unvalidated to avoid validating twice; response_model still checks the result
+    result = [
+        AccountResponse.model_construct(**{**acc, "type": AccountType(acc["type"])}, balance=balances[acc["id"]])
+        for acc in accounts
+    ]
     
     return AccountListResponse(accounts=result, total=len(result))
 
@@ -80,7 +93,7 @@ async def get_account(account_id: str, current_user: dict = Depends(get_current_
         raise HTTPException(status_code=404, detail="Account not found")
     
     starting_balance = account.get("starting_balance", 0.0)
-    balance = await calculate_account_balance(account_id, starting_balance)
+    balance = await calculate_account_balance(account_id, current_user["id"], starting_balance)
     return AccountResponse(**account, balance=balance)
 
 
@@ -89,7 +102,7 @@ async def update_account(
     account_id: str, data: AccountUpdate, current_user: dict = Depends(get_current_user)
 ):
     """Update an account"""
-    account = await db.finance_accounts.find_one({"id": account_id, "user_id": current_user["id"]})
+    account = await db.finance_accounts.find_one({"id": account_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
@@ -99,19 +112,38 @@ async def update_account(
     await db.finance_accounts.update_one({"id": account_id}, {"$set": update_data})
     updated = await db.finance_accounts.find_one({"id": account_id}, {"_id": 0})
     starting_balance = updated.get("starting_balance", 0.0)
-    balance = await calculate_account_balance(account_id, starting_balance)
+    balance = await calculate_account_balance(account_id, current_user["id"], starting_balance)
     return AccountResponse(**updated, balance=balance)
 
 
+async def count_linked_transactions(collection, doc_id: str, user_id: str, field: str) -> Optional[int]:
+    """Check ownership of a document and count the transactions referencing it in one round trip.
+    
+    Returns None when the document does not exist for this user.
+    """
+    pipeline = [
+        {"$match": {"id": doc_id, "user_id": user_id}},
+        {"$lookup": {
+            "from": "finance_transactions",
+            "localField": "id",
+            "foreignField": field,
+            "pipeline": [{"$count": "n"}],
+            "as": "_transactions"
+        }},
+        {"$project": {"_id": 0, "tx_count": {"$ifNull": [{"$first": "$_transactions.n"}, 0]}}}
+    ]
+    result = await collection.aggregate(pipeline).to_list(1)
+    return result[0]["tx_count"] if result else None
+
+
 @router.delete("/accounts/{account_id}", response_model=MessageResponse)
 async def delete_account(account_id: str, current_user: dict = Depends(get_current_user)):
     """Delete an account (only if no transactions)"""
-    account = await db.finance_accounts.find_one({"id": account_id, "user_id": current_user["id"]})
-    if not account:
+    tx_count = await count_linked_transactions(db.finance_accounts, account_id, current_user["id"], "account_id")
+    if tx_count is None:
         raise HTTPException(status_code=404, detail="Account not found")
     
     # Check for transactions
-    tx_count = await db.finance_transactions.count_documents({"account_id": account_id})
     if tx_count > 0:
         raise HTTPException(status_code=400, detail=f"Cannot delete account with {tx_count} transactions")
     
@@ -124,7 +156,7 @@ async def delete_account(account_id: str, current_user: dict = Depends(get_curre
 @router.post("/categories", response_model=CategoryResponse)
 async def create_category(data: CategoryCreate, current_user: dict = Depends(get_current_user)):
     """Create a new category for a project"""
-    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]})
+    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -140,8 +172,12 @@ async def create_category(data: CategoryCreate, current_user: dict = Depends(get
         "created_at": now
     }
     
-    await db.finance_categories.insert_one(category_doc)
-    return CategoryResponse(**{k: v for k, v in category_doc.items() if k != "_id"})
+    try:
+        await db.finance_categories.insert_one(category_doc)
+        category_doc.pop("_id", None)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="A category with this name already exists for this project")
+    return CategoryResponse(**category_doc)
 
 
 @router.get("/categories", response_model=CategoryListResponse)
@@ -154,30 +190,29 @@ async def list_categories(
     if project_id:
         query["project_id"] = project_id
     
-    categories = await db.finance_categories.find(query, {"_id": 0}).to_list(1000)
+    categories = await db.finance_categories.find(
+        query, {"_id": 0, "id": 1, "project_id": 1, "name": 1, "type": 1, "created_at": 1}
+    ).to_list(1000)
     return CategoryListResponse(
-        categories=[CategoryResponse(**c) for c in categories],
+        categories=[CategoryResponse.model_construct(**{**c, "type": CategoryType(c["type"])}) for c in categories],
         total=len(categories)
     )
 
 
 @router.post("/categories/seed/{project_id}", response_model=CategoryListResponse)
 async def seed_default_categories(project_id: str, current_user: dict = Depends(get_current_user)):
-    """Seed default categories for a project"""
-    project = await db.projects.find_one({"id": project_id, "user_id": current_user["id"]})
+    """Seed default categories for a project.
+    
+    The unique (user_id, project_id, name) index rejects defaults that already
+    exist, so concurrent seeds cannot create duplicates.
+    """
+    project = await db.projects.find_one({"id": project_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if categories already exist
-    existing = await db.finance_categories.count_documents({"project_id": project_id, "user_id": current_user["id"]})
-    if existing > 0:
-        raise HTTPException(status_code=400, detail="Categories already exist for this project")
-    
     now = datetime.now(timezone.utc).isoformat()
-    categories = []
-    
-    for cat in DEFAULT_CATEGORIES:
-        category_doc = {
+    category_docs = [
+        {
             "id": str(uuid.uuid4()),
             "user_id": current_user["id"],
             "project_id": project_id,
@@ -185,8 +220,21 @@ async def seed_default_categories(project_id: str, current_user: dict = Depends(
             "type": cat["type"],
             "created_at": now
         }
-        await db.finance_categories.insert_one(category_doc)
-        categories.append(CategoryResponse(**{k: v for k, v in category_doc.items() if k != "_id"}))
+        for cat in DEFAULT_CATEGORIES
+    ]
+    # Build responses before the insert adds _id to the documents
+    categories = [CategoryResponse(**doc) for doc in category_docs]
+    
+    try:
+        await db.finance_categories.bulk_write([InsertOne(doc) for doc in category_docs], ordered=False)
+    except BulkWriteError as e:
+        if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+            raise
+        if e.details["nInserted"] == 0:
+            raise HTTPException(status_code=400, detail="Categories already exist for this project")
+        # Only report the defaults that were actually added
+        duplicates = {err["index"] for err in e.details["writeErrors"]}
+        categories = [c for i, c in enumerate(categories) if i not in duplicates]
     
     return CategoryListResponse(categories=categories, total=len(categories))
 
@@ -194,11 +242,10 @@ async def seed_default_categories(project_id: str, current_user: dict = Depends(
 @router.delete("/categories/{category_id}", response_model=MessageResponse)
 async def delete_category(category_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a category (only if no transactions)"""
-    category = await db.finance_categories.find_one({"id": category_id, "user_id": current_user["id"]})
-    if not category:
+    tx_count = await count_linked_transactions(db.finance_categories, category_id, current_user["id"], "category_id")
+    if tx_count is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    tx_count = await db.finance_transactions.count_documents({"category_id": category_id})
     if tx_count > 0:
         raise HTTPException(status_code=400, detail=f"Cannot delete category with {tx_count} transactions")
     
@@ -208,30 +255,59 @@ async def delete_category(category_id: str, current_user: dict = Depends(get_cur
 
 # ============ TRANSACTIONS ============
 
+async def no_result():
+    """Placeholder awaitable for optional lookups inside asyncio.gather"""
+    return None
+
+
+def transaction_name_stages() -> list:
+    """Aggregation stages joining account, project, category and savings goal names onto transactions"""
+    def lookup(collection: str, local_field: str, alias: str, fields: dict) -> dict:
+        return {"$lookup": {
+            "from": collection,
+            "localField": local_field,
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, **fields}}],
+            "as": alias
+        }}
+    
+    return [
+        lookup("finance_accounts", "account_id", "_account", {"name": 1}),
+        lookup("projects", "project_id", "_project", {"name": 1}),
+        lookup("finance_categories", "category_id", "_category", {"name": 1, "type": 1}),
+        lookup("finance_savings_goals", "savings_goal_id", "_savings_goal", {"name": 1}),
+        {"$addFields": {
+            "account_name": {"$first": "$_account.name"},
+            "project_name": {"$first": "$_project.name"},
+            "category_name": {"$first": "$_category.name"},
+            "category_type": {"$first": "$_category.type"},
+            "savings_goal_name": {"$first": "$_savings_goal.name"}
+        }},
+        {"$project": {"_id": 0, "_account": 0, "_project": 0, "_category": 0, "_savings_goal": 0}}
+    ]
+
+
 @router.post("/transactions", response_model=TransactionResponse)
 async def create_transaction(data: TransactionCreate, current_user: dict = Depends(get_current_user)):
     """Create a new transaction"""
-    # Verify project access
-    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]})
+    user_id = current_user["id"]
+    
+    # Verify project, account, category and savings goal (if provided) concurrently
+    project, account, category, savings_goal = await asyncio.gather(
+        db.projects.find_one({"id": data.project_id, "user_id": user_id}, {"_id": 0, "name": 1}),
+        db.finance_accounts.find_one({"id": data.account_id, "user_id": user_id}, {"_id": 0, "name": 1}),
+        db.finance_categories.find_one({"id": data.category_id, "user_id": user_id}, {"_id": 0, "name": 1, "type": 1}),
+        db.finance_savings_goals.find_one({"id": data.savings_goal_id, "user_id": user_id}, {"_id": 0, "name": 1})
+        if data.savings_goal_id else no_result()
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Verify account
-    account = await db.finance_accounts.find_one({"id": data.account_id, "user_id": current_user["id"]})
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
-    
-    # Verify category
-    category = await db.finance_categories.find_one({"id": data.category_id, "user_id": current_user["id"]})
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    
-    # Verify savings goal if provided
-    savings_goal = None
-    if data.savings_goal_id:
-        savings_goal = await db.finance_savings_goals.find_one({"id": data.savings_goal_id, "user_id": current_user["id"]})
-        if not savings_goal:
-            raise HTTPException(status_code=404, detail="Savings goal not found")
+    if data.savings_goal_id and not savings_goal:
+        raise HTTPException(status_code=404, detail="Savings goal not found")
     
     tx_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
@@ -252,9 +328,10 @@ async def create_transaction(data: TransactionCreate, current_user: dict = Depen
     }
     
     await db.finance_transactions.insert_one(tx_doc)
+    tx_doc.pop("_id", None)
     
     return TransactionResponse(
-        **{k: v for k, v in tx_doc.items() if k != "_id"},
+        **tx_doc,
         account_name=account["name"],
         project_name=project["name"],
         category_name=category["name"],
@@ -275,6 +352,7 @@ async def list_transactions(
     sort_order: str = "desc",
     limit: int = Query(100, le=1000),
     offset: int = 0,
+    count: bool = Query(True, description="Return an exact total even when more pages follow"),
     current_user: dict = Depends(get_current_user)
 ):
     """List transactions with filters"""
@@ -297,34 +375,31 @@ async def list_transactions(
             query["date"] = {"$lte": end_date}
     
     sort_direction = -1 if sort_order == "desc" else 1
-    total = await db.finance_transactions.count_documents(query)
-    
-    transactions = await db.finance_transactions.find(query, {"_id": 0}) \
-        .sort(sort_by, sort_direction) \
-        .skip(offset) \
-        .limit(limit) \
-        .to_list(limit)
     
-    # Enrich with names
-    result = []
-    for tx in transactions:
-        account = await db.finance_accounts.find_one({"id": tx["account_id"]}, {"_id": 0, "name": 1})
-        project = await db.projects.find_one({"id": tx["project_id"]}, {"_id": 0, "name": 1})
-        category = await db.finance_categories.find_one({"id": tx["category_id"]}, {"_id": 0, "name": 1, "type": 1})
-        savings_goal = None
-        if tx.get("savings_goal_id"):
-            savings_goal = await db.finance_savings_goals.find_one({"id": tx["savings_goal_id"]}, {"_id": 0, "name": 1})
-        
-        result.append(TransactionResponse(
-            **tx,
-            account_name=account["name"] if account else None,
-            project_name=project["name"] if project else None,
-            category_name=category["name"] if category else None,
-            category_type=category["type"] if category else None,
-            savings_goal_name=savings_goal["name"] if savings_goal else None
-        ))
+    # Page and enrich with names in a single aggregation; one extra row tells us if more pages follow
+    transactions = await db.finance_transactions.aggregate([
+        {"$match": query},
+        {"$sort": {sort_by: sort_direction}},
+        {"$skip": offset},
+        {"$limit": limit + 1},
+        *transaction_name_stages()
+    ]).to_list(limit + 1)
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
+    
+    # The total is only unknown when the page is full (or past the end); count then, if asked
+    if not has_more and (transactions or offset == 0):
+        total = offset + len(transactions)
+    elif count:
+        total = await db.finance_transactions.count_documents(query)
+    else:
+        total = None
     
-    return TransactionListResponse(transactions=result, total=total)
+    return TransactionListResponse(
+        transactions=[TransactionResponse.model_construct(**tx) for tx in transactions],
+        total=total,
+        has_more=has_more
+    )
 
 
 @router.put("/transactions/{tx_id}", response_model=TransactionResponse)
@@ -332,15 +407,17 @@ async def update_transaction(
     tx_id: str, data: TransactionUpdate, current_user: dict = Depends(get_current_user)
 ):
     """Update a transaction"""
-    tx = await db.finance_transactions.find_one({"id": tx_id, "user_id": current_user["id"]})
+    # Check ownership and validate savings_goal_id (if provided) concurrently
+    check_savings_goal = data.savings_goal_id is not None and data.savings_goal_id != ""
+    tx, savings_goal_check = await asyncio.gather(
+        db.finance_transactions.find_one({"id": tx_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1}),
+        db.finance_savings_goals.find_one({"id": data.savings_goal_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
+        if check_savings_goal else no_result()
+    )
     if not tx:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    
-    # Validate savings_goal_id if provided
-    if data.savings_goal_id is not None and data.savings_goal_id != "":
-        savings_goal_check = await db.finance_savings_goals.find_one({"id": data.savings_goal_id, "user_id": current_user["id"]})
-        if not savings_goal_check:
-            raise HTTPException(status_code=404, detail="Savings goal not found")
+    if check_savings_goal and not savings_goal_check:
+        raise HTTPException(status_code=404, detail="Savings goal not found")
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     # Allow clearing savings_goal_id by setting it to empty string or null
@@ -348,34 +425,25 @@ async def update_transaction(
         update_data["savings_goal_id"] = None
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.finance_transactions.update_one({"id": tx_id}, {"$set": update_data})
-    updated = await db.finance_transactions.find_one({"id": tx_id}, {"_id": 0})
-    
-    account = await db.finance_accounts.find_one({"id": updated["account_id"]}, {"_id": 0, "name": 1})
-    project = await db.projects.find_one({"id": updated["project_id"]}, {"_id": 0, "name": 1})
-    category = await db.finance_categories.find_one({"id": updated["category_id"]}, {"_id": 0, "name": 1, "type": 1})
-    savings_goal = None
-    if updated.get("savings_goal_id"):
-        savings_goal = await db.finance_savings_goals.find_one({"id": updated["savings_goal_id"]}, {"_id": 0, "name": 1})
+    await db.finance_transactions.update_one({"id": tx_id, "user_id": current_user["id"]}, {"$set": update_data})
+    updated = await db.finance_transactions.aggregate([
+        {"$match": {"id": tx_id, "user_id": current_user["id"]}},
+        *transaction_name_stages()
+    ]).to_list(1)
+    # Deleted between the ownership check and the re-read
+    if not updated:
+        raise HTTPException(status_code=404, detail="Transaction not found")
     
-    return TransactionResponse(
-        **updated,
-        account_name=account["name"] if account else None,
-        project_name=project["name"] if project else None,
-        category_name=category["name"] if category else None,
-        category_type=category["type"] if category else None,
-        savings_goal_name=savings_goal["name"] if savings_goal else None
-    )
+    return TransactionResponse.model_construct(**updated[0])
 
 
 @router.delete("/transactions/{tx_id}", response_model=MessageResponse)
 async def delete_transaction(tx_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a transaction"""
-    tx = await db.finance_transactions.find_one({"id": tx_id, "user_id": current_user["id"]})
-    if not tx:
+    result = await db.finance_transactions.delete_one({"id": tx_id, "user_id": current_user["id"]})
+    if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    await db.finance_transactions.delete_one({"id": tx_id})
     return MessageResponse(message="Transaction deleted")
 
 
@@ -383,10 +451,10 @@ async def delete_transaction(tx_id: str, current_user: dict = Depends(get_curren
 
 # ============ ANALYTICS ============
 
-async def calculate_account_balance(account_id: str, starting_balance: float = 0.0) -> float:
+async def calculate_account_balance(account_id: str, user_id: str, starting_balance: float = 0.0) -> float:
     """Calculate current balance of an account (starting_balance + sum of transactions)"""
     pipeline = [
-        {"$match": {"account_id": account_id}},
+        {"$match": {"user_id": user_id, "account_id": account_id}},
         {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
     ]
     result = await db.finance_transactions.aggregate(pipeline).to_list(1)
@@ -394,32 +462,69 @@ async def calculate_account_balance(account_id: str, starting_balance: float = 0
     return starting_balance + transaction_sum
 
 
+async def calculate_account_balances(accounts: List[dict], user_id: str) -> dict:
+    """Calculate current balances for several accounts with one aggregation, keyed by account id"""
+    pipeline = [
+        {"$match": {"user_id": user_id, "account_id": {"$in": [acc["id"] for acc in accounts]}}},
+        {"$group": {"_id": "$account_id", "total": {"$sum": "$amount"}}}
+    ]
+    result = await db.finance_transactions.aggregate(pipeline).to_list(None)
+    sums = {r["_id"]: r["total"] for r in result}
+    return {
+        acc["id"]: acc.get("starting_balance", 0.0) + sums.get(acc["id"], 0.0)
+        for acc in accounts
+    }
+
+
+def transaction_bucket_stages() -> list:
+    """Aggregation stages tagging each transaction with its category type and effective bucket.
+    
+    Positive amounts and income categories count as income, investment categories
+    as investments, everything else (including unknown categories) as expenses.
+    """
+    return [
+        {"$lookup": {
+            "from": "finance_categories",
+            "localField": "category_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "name": 1, "type": 1}}],
+            "as": "_category"
+        }},
+        {"$addFields": {
+            "category_name": {"$ifNull": [{"$first": "$_category.name"}, "Unknown"]},
+            "category_type": {"$ifNull": [{"$first": "$_category.type"}, "expense"]}
+        }},
+        {"$addFields": {
+            "bucket": {"$switch": {
+                "branches": [
+                    {"case": {"$or": [{"$eq": ["$category_type", "income"]}, {"$gt": ["$amount", 0]}]},
+                     "then": "income"},
+                    {"case": {"$eq": ["$category_type", "investment"]}, "then": "investment"}
+                ],
+                "default": "expense"
+            }}
+        }}
+    ]
+
+
 @router.get("/dashboard/{project_id}", response_model=ProjectFinanceSummary)
 async def get_project_finance_dashboard(project_id: str, current_user: dict = Depends(get_current_user)):
     """Get financial summary for a project"""
-    project = await db.projects.find_one({"id": project_id, "user_id": current_user["id"]}, {"_id": 0})
+    project = await db.projects.find_one({"id": project_id, "user_id": current_user["id"]}, {"_id": 0, "name": 1, "created_at": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Get all categories for this project to identify types
-    categories = await db.finance_categories.find({"project_id": project_id}, {"_id": 0}).to_list(1000)
-    cat_types = {c["id"]: c["type"] for c in categories}
-    
-    # Get all transactions for this project
-    transactions = await db.finance_transactions.find({"project_id": project_id}, {"_id": 0}).to_list(10000)
-    
-    total_income = 0.0
-    total_expenses = 0.0
-    total_investments = 0.0
+    # Sum transactions per bucket server-side
+    pipeline = [
+        {"$match": {"project_id": project_id, "user_id": current_user["id"]}},
+        *transaction_bucket_stages(),
+        {"$group": {"_id": "$bucket", "total": {"$sum": {"$abs": "$amount"}}}}
+    ]
+    totals = {r["_id"]: r["total"] for r in await db.finance_transactions.aggregate(pipeline).to_list(3)}
     
-    for tx in transactions:
-        cat_type = cat_types.get(tx["category_id"], "expense")
-        if cat_type == "income" or tx["amount"] > 0:
-            total_income += abs(tx["amount"])
-        elif cat_type == "investment":
-            total_investments += abs(tx["amount"])
-        else:
-            total_expenses += abs(tx["amount"])
+    total_income = totals.get("income", 0.0)
+    total_expenses = totals.get("expense", 0.0)
+    total_investments = totals.get("investment", 0.0)
     
     # Calculate months active
     start_date = datetime.fromisoformat(project["created_at"].replace("Z", "+00:00"))
@@ -440,6 +545,15 @@ async def get_project_finance_dashboard(project_id: str, current_user: dict = De
     )
 
 
+@lru_cache(maxsize=256)
+def month_bounds(month: str) -> tuple:
+    """Return the first and last day (YYYY-MM-DD) of a YYYY-MM month"""
+    year, mon = map(int, month.split("-"))
+    next_month = datetime(year, mon, 1) + relativedelta(months=1)
+    end_date = (next_month - relativedelta(days=1)).strftime("%Y-%m-%d")
+    return f"{month}-01", end_date
+
+
 @router.get("/monthly", response_model=MonthlyOverview)
 async def get_monthly_overview(
     month: str = Query(..., description="Month in YYYY-MM format"),
@@ -449,11 +563,7 @@ async def get_monthly_overview(
     """Get monthly financial overview"""
     # Validate month format
     try:
-        year, mon = map(int, month.split("-"))
-        start_date = f"{month}-01"
-        # Calculate end of month
-        next_month = datetime(year, mon, 1) + relativedelta(months=1)
-        end_date = (next_month - relativedelta(days=1)).strftime("%Y-%m-%d")
+        start_date, end_date = month_bounds(month)
     except:
         raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM")
     
@@ -464,53 +574,53 @@ async def get_monthly_overview(
     if project_id:
         query["project_id"] = project_id
     
-    transactions = await db.finance_transactions.find(query, {"_id": 0}).to_list(10000)
-    
-    # Get categories for type lookup
-    cat_ids = list(set(tx["category_id"] for tx in transactions))
-    categories = await db.finance_categories.find({"id": {"$in": cat_ids}}, {"_id": 0}).to_list(1000)
-    cat_map = {c["id"]: c for c in categories}
-    
-    # Get projects for name lookup
-    proj_ids = list(set(tx["project_id"] for tx in transactions))
-    projects = await db.projects.find({"id": {"$in": proj_ids}}, {"_id": 0, "id": 1, "name": 1}).to_list(1000)
-    proj_map = {p["id"]: p["name"] for p in projects}
-    
-    total_income = 0.0
-    total_expenses = 0.0
-    total_investments = 0.0
+    # Sum per project, category and bucket server-side, then resolve project names
+    pipeline = [
+        {"$match": query},
+        *transaction_bucket_stages(),
+        {"$group": {
+            "_id": {
+                "project_id": "$project_id",
+                "category_name": "$category_name",
+                "category_type": "$category_type",
+                "bucket": "$bucket"
+            },
+            "total": {"$sum": {"$abs": "$amount"}}
+        }},
+        {"$lookup": {
+            "from": "projects",
+            "localField": "_id.project_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "name": 1}}],
+            "as": "_project"
+        }},
+        {"$addFields": {"project_name": {"$ifNull": [{"$first": "$_project.name"}, "Unknown"]}}},
+        {"$project": {"_project": 0}}
+    ]
+    totals = {"income": 0.0, "expense": 0.0, "investment": 0.0}
+    project_fields = {"income": "income", "expense": "expenses", "investment": "investments"}
     by_project = {}
     by_category = {}
     
-    for tx in transactions:
-        cat = cat_map.get(tx["category_id"], {})
-        cat_type = cat.get("type", "expense")
-        cat_name = cat.get("name", "Unknown")
-        proj_name = proj_map.get(tx["project_id"], "Unknown")
-        
-        amount = tx["amount"]
-        
-        if cat_type == "income" or amount > 0:
-            total_income += abs(amount)
-        elif cat_type == "investment":
-            total_investments += abs(amount)
-        else:
-            total_expenses += abs(amount)
+    # Fold groups as they stream in rather than materializing the whole result
+    async for group in db.finance_transactions.aggregate(pipeline):
+        key = group["_id"]
+        amount = group["total"]
+        totals[key["bucket"]] += amount
         
         # By project
-        if proj_name not in by_project:
-            by_project[proj_name] = {"income": 0, "expenses": 0, "investments": 0}
-        if cat_type == "income" or amount > 0:
-            by_project[proj_name]["income"] += abs(amount)
-        elif cat_type == "investment":
-            by_project[proj_name]["investments"] += abs(amount)
-        else:
-            by_project[proj_name]["expenses"] += abs(amount)
+        if group["project_name"] not in by_project:
+            by_project[group["project_name"]] = {"income": 0, "expenses": 0, "investments": 0}
+        by_project[group["project_name"]][project_fields[key["bucket"]]] += amount
         
         # By category
-        if cat_name not in by_category:
-            by_category[cat_name] = {"type": cat_type, "total": 0}
-        by_category[cat_name]["total"] += abs(amount)
+        if key["category_name"] not in by_category:
+            by_category[key["category_name"]] = {"type": key["category_type"], "total": 0}
+        by_category[key["category_name"]]["total"] += amount
+    
+    total_income = totals["income"]
+    total_expenses = totals["expense"]
+    total_investments = totals["investment"]
     
     return MonthlyOverview(
         month=month,
@@ -537,22 +647,23 @@ async def calculate_runway(
         acc_ids = [a.strip() for a in account_ids.split(",")]
         accounts = await db.finance_accounts.find(
             {"id": {"$in": acc_ids}, "user_id": current_user["id"]},
-            {"_id": 0}
+            {"_id": 0, "id": 1, "name": 1, "type": 1, "starting_balance": 1}
         ).to_list(100)
     else:
         # Default: only bank and cash accounts
         accounts = await db.finance_accounts.find(
             {"user_id": current_user["id"], "type": {"$in": ["bank", "cash"]}},
-            {"_id": 0}
+            {"_id": 0, "id": 1, "name": 1, "type": 1, "starting_balance": 1}
         ).to_list(100)
     
     # Calculate total liquid cash
     accounts_included = []
     total_liquid_cash = 0.0
+    balances = await calculate_account_balances(accounts, current_user["id"])
     
     for acc in accounts:
         starting_balance = acc.get("starting_balance", 0.0)
-        balance = await calculate_account_balance(acc["id"], starting_balance)
+        balance = balances[acc["id"]]
         total_liquid_cash += balance
         accounts_included.append({
             "id": acc["id"],
@@ -566,21 +677,27 @@ async def calculate_runway(
     end_date = datetime.now(timezone.utc)
     start_date = end_date - relativedelta(months=months_for_average)
     
-    # Get expense categories (exclude income and investment)
-    expense_categories = await db.finance_categories.find(
-        {"user_id": current_user["id"], "type": "expense"},
-        {"_id": 0, "id": 1}
-    ).to_list(1000)
-    expense_cat_ids = [c["id"] for c in expense_categories]
-    
-    # Get expense transactions
-    expenses = await db.finance_transactions.find({
-        "user_id": current_user["id"],
-        "category_id": {"$in": expense_cat_ids},
-        "date": {"$gte": start_date.strftime("%Y-%m-%d"), "$lte": end_date.strftime("%Y-%m-%d")}
-    }, {"_id": 0, "amount": 1}).to_list(10000)
-    
-    total_expenses = sum(abs(tx["amount"]) for tx in expenses)
+    # Sum expense transactions (excluding income and investment categories) server-side
+    pipeline = [
+        {"$match": {
+            "user_id": current_user["id"],
+            "date": {"$gte": start_date.strftime("%Y-%m-%d"), "$lte": end_date.strftime("%Y-%m-%d")}
+        }},
+        {"$lookup": {
+            "from": "finance_categories",
+            "localField": "category_id",
+            "foreignField": "id",
+            "pipeline": [
+                {"$match": {"user_id": current_user["id"], "type": "expense"}},
+                {"$project": {"_id": 0, "id": 1}}
+            ],
+            "as": "_category"
+        }},
+        {"$match": {"_category": {"$ne": []}}},
+        {"$group": {"_id": None, "total": {"$sum": {"$abs": "$amount"}}}}
+    ]
+    result = await db.finance_transactions.aggregate(pipeline).to_list(1)
+    total_expenses = result[0]["total"] if result else 0.0
     avg_monthly_burn = total_expenses / months_for_average if months_for_average > 0 else 0.0
     
     # Calculate runway
@@ -600,10 +717,10 @@ async def calculate_runway(
 
 # ============ SAVINGS GOALS ============
 
-async def calculate_savings_goal_progress(goal_id: str) -> tuple:
+async def calculate_savings_goal_progress(goal_id: str, user_id: str) -> tuple:
     """Calculate current amount saved towards a goal"""
     pipeline = [
-        {"$match": {"savings_goal_id": goal_id}},
+        {"$match": {"user_id": user_id, "savings_goal_id": goal_id}},
         {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
     ]
     result = await db.finance_transactions.aggregate(pipeline).to_list(1)
@@ -614,7 +731,7 @@ async def calculate_savings_goal_progress(goal_id: str) -> tuple:
 @router.post("/savings-goals", response_model=SavingsGoalResponse)
 async def create_savings_goal(data: SavingsGoalCreate, current_user: dict = Depends(get_current_user)):
     """Create a new savings goal"""
-    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]})
+    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]}, {"_id": 0, "name": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -633,9 +750,10 @@ async def create_savings_goal(data: SavingsGoalCreate, current_user: dict = Depe
     }
     
     await db.finance_savings_goals.insert_one(goal_doc)
+    goal_doc.pop("_id", None)
     
     return SavingsGoalResponse(
-        **{k: v for k, v in goal_doc.items() if k != "_id"},
+        **goal_doc,
         project_name=project["name"],
         current_amount=0.0,
         progress_percent=0.0
@@ -652,17 +770,41 @@ async def list_savings_goals(
     if project_id:
         query["project_id"] = project_id
     
-    goals = await db.finance_savings_goals.find(query, {"_id": 0}).to_list(1000)
+    # Join project names and sum contributing transactions in one round trip
+    pipeline = [
+        {"$match": query},
+        {"$lookup": {
+            "from": "projects",
+            "localField": "project_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "name": 1}}],
+            "as": "_project"
+        }},
+        {"$lookup": {
+            "from": "finance_transactions",
+            "localField": "id",
+            "foreignField": "savings_goal_id",
+            "pipeline": [
+                {"$match": {"user_id": current_user["id"]}},
+                {"$group": {"_id": None, "total": {"$sum": "$amount"}}}
+            ],
+            "as": "_progress"
+        }},
+        {"$addFields": {
+            "project_name": {"$first": "$_project.name"},
+            "current_amount": {"$abs": {"$ifNull": [{"$first": "$_progress.total"}, 0.0]}}
+        }},
+        {"$project": {"_id": 0, "_project": 0, "_progress": 0}}
+    ]
+    goals = await db.finance_savings_goals.aggregate(pipeline).to_list(1000)
     
     result = []
     for goal in goals:
-        project = await db.projects.find_one({"id": goal["project_id"]}, {"_id": 0, "name": 1})
-        current_amount = await calculate_savings_goal_progress(goal["id"])
+        current_amount = goal.pop("current_amount")
         progress = (current_amount / goal["target_amount"] * 100) if goal["target_amount"] > 0 else 0
         
-        result.append(SavingsGoalResponse(
+        result.append(SavingsGoalResponse.model_construct(
             **goal,
-            project_name=project["name"] if project else None,
             current_amount=round(current_amount, 2),
             progress_percent=round(min(progress, 100), 1)
         ))
@@ -677,8 +819,10 @@ async def get_savings_goal(goal_id: str, current_user: dict = Depends(get_curren
     if not goal:
         raise HTTPException(status_code=404, detail="Savings goal not found")
     
-    project = await db.projects.find_one({"id": goal["project_id"]}, {"_id": 0, "name": 1})
-    current_amount = await calculate_savings_goal_progress(goal_id)
+    project, current_amount = await asyncio.gather(
+        db.projects.find_one({"id": goal["project_id"]}, {"_id": 0, "name": 1}),
+        calculate_savings_goal_progress(goal_id, current_user["id"])
+    )
     progress = (current_amount / goal["target_amount"] * 100) if goal["target_amount"] > 0 else 0
     
     return SavingsGoalResponse(
@@ -694,18 +838,23 @@ async def update_savings_goal(
     goal_id: str, data: SavingsGoalUpdate, current_user: dict = Depends(get_current_user)
 ):
     """Update a savings goal"""
-    goal = await db.finance_savings_goals.find_one({"id": goal_id, "user_id": current_user["id"]})
-    if not goal:
-        raise HTTPException(status_code=404, detail="Savings goal not found")
-    
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.finance_savings_goals.update_one({"id": goal_id}, {"$set": update_data})
-    updated = await db.finance_savings_goals.find_one({"id": goal_id}, {"_id": 0})
+    # Check ownership, update and read back in one round trip
+    updated = await db.finance_savings_goals.find_one_and_update(
+        {"id": goal_id, "user_id": current_user["id"]},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Savings goal not found")
     
-    project = await db.projects.find_one({"id": updated["project_id"]}, {"_id": 0, "name": 1})
-    current_amount = await calculate_savings_goal_progress(goal_id)
+    project, current_amount = await asyncio.gather(
+        db.projects.find_one({"id": updated["project_id"]}, {"_id": 0, "name": 1}),
+        calculate_savings_goal_progress(goal_id, current_user["id"])
+    )
     progress = (current_amount / updated["target_amount"] * 100) if updated["target_amount"] > 0 else 0
     
     return SavingsGoalResponse(
@@ -719,7 +868,7 @@ async def update_savings_goal(
 @router.delete("/savings-goals/{goal_id}", response_model=MessageResponse)
 async def delete_savings_goal(goal_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a savings goal (unlinks all transactions)"""
-    goal = await db.finance_savings_goals.find_one({"id": goal_id, "user_id": current_user["id"]})
+    goal = await db.finance_savings_goals.find_one({"id": goal_id, "user_id": current_user["id"]}, {"_id": 0, "id": 1})
     if not goal:
         raise HTTPException(status_code=404, detail="Savings goal not found")
     
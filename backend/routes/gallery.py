@@ -2,14 +2,17 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from typing import Optional
 from datetime import datetime, timezone
+import asyncio
 import uuid
 
+import aiofiles
+
 from config import db, UPLOADS_DIR, MAX_UPLOAD_SIZE, MAX_UPLOAD_SIZE_MB
 from models import (
     GalleryFolderCreate, GalleryFolderUpdate, GalleryFolderResponse,
     GalleryImageResponse, GalleryListResponse, MessageResponse
 )
-from services import get_current_user, verify_project_access
+from services import get_current_user, verify_project_access, search_regex
 
 router = APIRouter()
 
@@ -41,7 +44,8 @@ async def create_gallery_folder(
     }
     
     await db.gallery_folders.insert_one(folder_doc)
-    return GalleryFolderResponse(**{k: v for k, v in folder_doc.items() if k != "_id"})
+    folder_doc.pop("_id", None)
+    return GalleryFolderResponse(**folder_doc)
 
 
 @router.get("/projects/{project_id}/gallery", response_model=GalleryListResponse)
@@ -61,15 +65,17 @@ async def list_gallery_contents(
     image_query = {"project_id": project_id, "folder_id": folder_id}
     
     if search:
-        folder_query["name"] = {"$regex": search, "$options": "i"}
-        image_query["filename"] = {"$regex": search, "$options": "i"}
+        folder_query["name"] = search_regex(search)
+        image_query["filename"] = search_regex(search)
     
-    folders = await db.gallery_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    images = await db.gallery_images.find(image_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
+    folders, images = await asyncio.gather(
+        db.gallery_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000),
+        db.gallery_images.find(image_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
+    )
     
     return GalleryListResponse(
-        folders=[GalleryFolderResponse(**f) for f in folders],
-        images=[GalleryImageResponse(**i) for i in images]
+        folders=[GalleryFolderResponse.model_construct(**f) for f in folders],
+        images=[GalleryImageResponse.model_construct(**i) for i in images]
     )
 
 
@@ -102,20 +108,32 @@ async def delete_gallery_folder(
 ):
     await verify_project_access(project_id, current_user["id"])
     
-    async def delete_folder_recursive(fid: str):
-        subfolders = await db.gallery_folders.find({"parent_id": fid}).to_list(1000)
-        for subfolder in subfolders:
-            await delete_folder_recursive(subfolder["id"])
-        
-        images = await db.gallery_images.find({"folder_id": fid}).to_list(1000)
-        for img in images:
-            img_path = UPLOADS_DIR / img["url"].split("/uploads/")[-1]
-            if img_path.exists():
-                img_path.unlink()
-        await db.gallery_images.delete_many({"folder_id": fid})
-        await db.gallery_folders.delete_one({"id": fid})
-    
-    await delete_folder_recursive(folder_id)
+    # Resolve the folder and all its descendants in one round trip
+    tree = await db.gallery_folders.aggregate([
+        {"$match": {"id": folder_id, "project_id": project_id}},
+        {"$graphLookup": {
+            "from": "gallery_folders",
+            "startWith": "$id",
+            "connectFromField": "id",
+            "connectToField": "parent_id",
+            "restrictSearchWithMatch": {"project_id": project_id},
+            "as": "descendants"
+        }},
+        {"$project": {"_id": 0, "ids": {"$concatArrays": [["$id"], "$descendants.id"]}}}
+    ]).to_list(1)
+    if not tree:
+        return MessageResponse(message="Folder and contents deleted")
+    folder_ids = tree[0]["ids"]
+    
+    images = await db.gallery_images.find({"folder_id": {"$in": folder_ids}}, {"_id": 0, "url": 1}).to_list(None)
+    await asyncio.gather(*(
+        asyncio.to_thread((UPLOADS_DIR / img["url"].split("/uploads/")[-1]).unlink, missing_ok=True)
+        for img in images
+    ))
+    await asyncio.gather(
+        db.gallery_images.delete_many({"folder_id": {"$in": folder_ids}}),
+        db.gallery_folders.delete_many({"id": {"$in": folder_ids}})
+    )
     return MessageResponse(message="Folder and contents deleted")
 
 
@@ -137,27 +155,32 @@ async def upload_gallery_image(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Invalid file type")
     
-    # Check file size
-    content = await file.read()
-    if len(content) > MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=413, 
-            detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB}MB"
-        )
-    
     image_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
     gallery_dir = UPLOADS_DIR / "gallery" / project_id
-    gallery_dir.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(gallery_dir.mkdir, parents=True, exist_ok=True)
     
     file_ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
     filename = f"{image_id}.{file_ext}"
     file_path = gallery_dir / filename
     
-    # content already read for size check
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Stream to disk in chunks, checking the size as we go
+    total = 0
+    too_large = False
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(1 << 20):
+            total += len(chunk)
+            if total > MAX_UPLOAD_SIZE:
+                too_large = True
+                break
+            await f.write(chunk)
+    if too_large:
+        await asyncio.to_thread(file_path.unlink, missing_ok=True)
+        raise HTTPException(
+            status_code=413, 
+            detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB}MB"
+        )
     
     image_doc = {
         "id": image_id,
@@ -169,7 +192,8 @@ async def upload_gallery_image(
     }
     
     await db.gallery_images.insert_one(image_doc)
-    return GalleryImageResponse(**{k: v for k, v in image_doc.items() if k != "_id"})
+    image_doc.pop("_id", None)
+    return GalleryImageResponse(**image_doc)
 
 
 @router.delete("/projects/{project_id}/gallery/images/{image_id}", response_model=MessageResponse)
@@ -185,8 +209,7 @@ async def delete_gallery_image(
         raise HTTPException(status_code=404, detail="Image not found")
     
     img_path = UPLOADS_DIR / image["url"].split("/uploads/")[-1]
-    if img_path.exists():
-        img_path.unlink()
+    await asyncio.to_thread(img_path.unlink, missing_ok=True)
     
     await db.gallery_images.delete_one({"id": image_id})
     return MessageResponse(message="Image deleted")
@@ -202,17 +225,26 @@ async def get_gallery_folder_path(
     """Get the full path of a folder for breadcrumb navigation"""
     await verify_project_access(project_id, current_user["id"])
     
-    path = []
-    current_folder_id = folder_id
-    
-    while current_folder_id:
-        folder = await db.gallery_folders.find_one(
-            {"id": current_folder_id, "project_id": project_id},
-            {"_id": 0}
-        )
-        if not folder:
-            break
-        path.insert(0, {"id": folder["id"], "name": folder["name"]})
-        current_folder_id = folder.get("parent_id")
+    # Walk up the parent chain server-side instead of one query per level
+    result = await db.gallery_folders.aggregate([
+        {"$match": {"id": folder_id, "project_id": project_id}},
+        {"$graphLookup": {
+            "from": "gallery_folders",
+            "startWith": "$parent_id",
+            "connectFromField": "parent_id",
+            "connectToField": "id",
+            "restrictSearchWithMatch": {"project_id": project_id},
+            "depthField": "depth",
+            "as": "ancestors"
+        }},
+        {"$project": {"_id": 0, "id": 1, "name": 1, "ancestors.id": 1, "ancestors.name": 1, "ancestors.depth": 1}}
+    ]).to_list(1)
+    if not result:
+        return {"path": []}
+    
+    folder = result[0]
+    ancestors = sorted(folder["ancestors"], key=lambda a: a["depth"], reverse=True)
+    path = [{"id": a["id"], "name": a["name"]} for a in ancestors]
+    path.append({"id": folder["id"], "name": folder["name"]})
     
     return {"path": path}
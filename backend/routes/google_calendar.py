@@ -4,6 +4,8 @@ from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timezone
+from pymongo import UpdateOne
+import asyncio
 import uuid
 import os
 
@@ -22,6 +24,9 @@ from services.google_calendar import (
 
 router = APIRouter()
 
+# Concurrent Google Calendar requests per bulk sync
+SYNC_CONCURRENCY = 10
+
 # Get the frontend URL for redirects
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'https://earthly-garden-draft.preview.emergentagent.com')
 
@@ -46,9 +51,7 @@ class GoogleCalendarStatus(BaseModel):
 @router.get("/status", response_model=GoogleCalendarStatus)
 async def get_calendar_status(current_user: dict = Depends(get_current_user)):
     """Get current Google Calendar connection status."""
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
-    
-    google_config = user.get("google_calendar", {})
+    google_config = current_user.get("google_calendar", {})
     
     return GoogleCalendarStatus(
         connected=google_config.get("connected", False),
@@ -69,8 +72,7 @@ async def save_calendar_settings(
     now = datetime.now(timezone.utc).isoformat()
     
     # Get existing config to preserve tokens if already connected
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
-    existing_config = user.get("google_calendar", {})
+    existing_config = current_user.get("google_calendar", {})
     
     update_data = {
         "google_calendar.client_id": settings.client_id,
@@ -99,8 +101,7 @@ async def save_calendar_settings(
 @router.get("/connect")
 async def connect_google_calendar(current_user: dict = Depends(get_current_user)):
     """Start Google OAuth flow."""
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
-    google_config = user.get("google_calendar", {})
+    google_config = current_user.get("google_calendar", {})
     
     client_id = google_config.get("client_id")
     client_secret = google_config.get("client_secret")
@@ -141,7 +142,7 @@ async def google_callback(
         raise HTTPException(status_code=400, detail="Invalid state parameter")
     
     # Verify state
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "id": 1, "google_calendar": 1})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -161,14 +162,14 @@ async def google_callback(
     redirect_uri = f"{FRONTEND_URL}/api/google-calendar/callback"
     
     try:
-        tokens = exchange_code_for_tokens(code, client_id, client_secret, redirect_uri)
+        tokens = await asyncio.to_thread(exchange_code_for_tokens, code, client_id, client_secret, redirect_uri)
     except Exception as e:
         # Redirect to settings with error
         return RedirectResponse(f"{FRONTEND_URL}/settings?google_error=token_exchange_failed")
     
     # Get user's Google email
     try:
-        google_email = get_google_user_email(tokens.get("access_token"))
+        google_email = await asyncio.to_thread(get_google_user_email, tokens.get("access_token"))
     except Exception as e:
         google_email = None
     
@@ -207,8 +208,7 @@ async def disconnect_google_calendar(current_user: dict = Depends(get_current_us
 @router.post("/sync-all-tasks")
 async def sync_all_tasks(current_user: dict = Depends(get_current_user)):
     """Manually sync all tasks to Google Calendar."""
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
-    google_config = user.get("google_calendar", {})
+    google_config = current_user.get("google_calendar", {})
     
     if not google_config.get("connected"):
         raise HTTPException(status_code=400, detail="Google Calendar not connected")
@@ -223,21 +223,27 @@ async def sync_all_tasks(current_user: dict = Depends(get_current_user)):
         "status": {"$ne": "completed"}
     }, {"_id": 0}).to_list(1000)
     
-    synced = 0
-    failed = 0
-    
-    for task in tasks:
-        try:
-            event_id = await sync_task_to_calendar(db, current_user["id"], task)
-            if event_id:
-                # Update task with google event id
-                await db.tasks.update_one(
-                    {"id": task["id"]},
-                    {"$set": {"google_event_id": event_id}}
-                )
-                synced += 1
-        except Exception as e:
-            failed += 1
+    sem = asyncio.Semaphore(SYNC_CONCURRENCY)
+    
+    async def sync_one(task: dict):
+        async with sem:
+            try:
+                return await sync_task_to_calendar(db, current_user["id"], task), False
+            except Exception:
+                return None, True
+    
+    results = await asyncio.gather(*(sync_one(task) for task in tasks))
+    
+    # Store all google event ids in one batch
+    updates = [
+        UpdateOne({"id": task["id"]}, {"$set": {"google_event_id": event_id}})
+        for task, (event_id, _) in zip(tasks, results) if event_id
+    ]
+    if updates:
+        await db.tasks.bulk_write(updates, ordered=False)
+    
+    synced = len(updates)
+    failed = sum(1 for _, error in results if error)
     
     return {"message": f"Synced {synced} tasks, {failed} failed"}
 
@@ -245,8 +251,7 @@ async def sync_all_tasks(current_user: dict = Depends(get_current_user)):
 @router.post("/sync-all-routines")
 async def sync_all_routines(current_user: dict = Depends(get_current_user)):
     """Manually sync today's routines to Google Calendar."""
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
-    google_config = user.get("google_calendar", {})
+    google_config = current_user.get("google_calendar", {})
     
     if not google_config.get("connected"):
         raise HTTPException(status_code=400, detail="Google Calendar not connected")
@@ -261,16 +266,18 @@ async def sync_all_routines(current_user: dict = Depends(get_current_user)):
     }, {"_id": 0}).to_list(1000)
     
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    synced = 0
-    failed = 0
+    sem = asyncio.Semaphore(SYNC_CONCURRENCY)
+    
+    async def sync_one(routine: dict):
+        async with sem:
+            try:
+                return await sync_routine_to_calendar(db, current_user["id"], routine, today), False
+            except Exception:
+                return None, True
     
-    for routine in routines:
-        try:
-            event_id = await sync_routine_to_calendar(db, current_user["id"], routine, today)
-            if event_id:
-                synced += 1
-        except Exception as e:
-            failed += 1
+    results = await asyncio.gather(*(sync_one(routine) for routine in routines))
+    synced = sum(1 for event_id, _ in results if event_id)
+    failed = sum(1 for _, error in results if error)
     
     return {"message": f"Synced {synced} routines for today, {failed} failed"}
 
@@ -278,8 +285,7 @@ async def sync_all_routines(current_user: dict = Depends(get_current_user)):
 @router.get("/test-connection")
 async def test_connection(current_user: dict = Depends(get_current_user)):
     """Test if Google Calendar connection is working."""
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
-    google_config = user.get("google_calendar", {})
+    google_config = current_user.get("google_calendar", {})
     
     if not google_config.get("connected"):
         raise HTTPException(status_code=400, detail="Google Calendar not connected")
@@ -297,7 +303,7 @@ async def test_connection(current_user: dict = Depends(get_current_user)):
         service = get_calendar_service(creds)
         
         # Try to list calendars
-        calendars = service.calendarList().list(maxResults=1).execute()
+        calendars = await asyncio.to_thread(service.calendarList().list(maxResults=1).execute)
         
         return {
             "status": "ok",
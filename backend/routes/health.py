@@ -1,26 +1,62 @@
 """Health check routes."""
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
+import asyncio
+import os
+import stat
+import time
 import jwt
+import orjson
 
 from config import db, APP_NAME, UPLOADS_DIR, JWT_SECRET, JWT_ALGORITHM, MAX_UPLOAD_SIZE_MB
 
 router = APIRouter()
 security = HTTPBearer(auto_error=False)
 
+UPLOADS_ROOT = str(UPLOADS_DIR.resolve()) + os.sep
+
+# Health response body, rebuilt at most once per second: (second, body)
+_health_body = (None, b"")
+
+# Resolved file-serving users keyed by raw token: token -> (user, expires_at)
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 300
+_token_cache = {}
+
+# Gallery image visibility keyed by (project_id, image_id): key -> (image, expires_at).
+# Visibility flips take up to GALLERY_ACCESS_TTL seconds to reach file serving.
+GALLERY_ACCESS_CACHE_SIZE = 4096
+GALLERY_ACCESS_TTL = 30
+_gallery_access_cache = {}
+
+
+def stat_upload(full_path: Path):
+    """Resolve an upload path and stat it in one go; returns (real_path, stat) or (None, None) outside uploads"""
+    real_path = os.path.realpath(full_path)
+    if not real_path.startswith(UPLOADS_ROOT):
+        return None, None
+    try:
+        return real_path, os.stat(real_path)
+    except OSError:
+        return real_path, None
+
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "app": APP_NAME,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+    global _health_body
+    second = int(time.time())
+    if _health_body[0] != second:
+        _health_body = (second, orjson.dumps({
+            "status": "healthy",
+            "app": APP_NAME,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }))
+    return Response(content=_health_body[1], media_type="application/json")
 
 
 @router.get("/config")
@@ -48,15 +84,29 @@ async def get_optional_user(
     if not auth_token:
         return None
     
+    # Gallery pages fire many file requests with the same token; skip decode and lookup on reuse
+    now = time.time()
+    cached = _token_cache.get(auth_token)
+    if cached:
+        if cached[1] > now:
+            return cached[0]
+        del _token_cache[auth_token]
+    
     try:
         payload = jwt.decode(auth_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id = payload.get("sub")
         if not user_id:
             return None
         user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
-        return user
     except:
         return None
+    
+    # Only valid tokens of existing users are cached, never beyond the token's own expiry
+    if user and "exp" in payload:
+        if len(_token_cache) >= TOKEN_CACHE_SIZE:
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[auth_token] = (user, min(payload["exp"], now + TOKEN_CACHE_TTL))
+    return user
 
 
 async def check_gallery_image_access(file_path: str, user: Optional[dict]) -> bool:
@@ -82,14 +132,13 @@ async def check_gallery_image_access(file_path: str, user: Optional[dict]) -> bo
     # Get image id from filename (format: {uuid}.{ext})
     image_id = image_filename.rsplit('.', 1)[0] if '.' in image_filename else image_filename
     
-    # Find the image
-    image = await db.gallery_images.find_one({"id": image_id, "project_id": project_id})
-    if not image:
+    image = await get_gallery_image_visibility(project_id, image_id)
+    if image is None:
         # Image not found in DB, might be legacy - allow access
         return True
     
     # Get the project
-    project = await db.projects.find_one({"id": project_id})
+    project = image.get("project")
     if not project:
         return False
     
@@ -98,7 +147,7 @@ async def check_gallery_image_access(file_path: str, user: Optional[dict]) -> bo
     
     if folder_id:
         # Image is in a folder - check if folder is public
-        folder = await db.gallery_folders.find_one({"id": folder_id, "project_id": project_id})
+        folder = image.get("folder")
         if folder:
             if folder.get("is_public", False):
                 # Folder is public - allow access
@@ -125,6 +174,55 @@ async def check_gallery_image_access(file_path: str, user: Optional[dict]) -> bo
     return project.get("user_id") == user.get("id")
 
 
+async def get_gallery_image_visibility(project_id: str, image_id: str) -> Optional[dict]:
+    """Fetch an image with its project owner/visibility and folder visibility, briefly cached.
+    
+    A page of thumbnails requests the same images again on every visit, so the
+    result is reused for GALLERY_ACCESS_TTL seconds. Returns None for unknown images.
+    """
+    key = (project_id, image_id)
+    now = time.time()
+    cached = _gallery_access_cache.get(key)
+    if cached:
+        if cached[1] > now:
+            return cached[0]
+        del _gallery_access_cache[key]
+    
+    # Find the image together with its project and folder visibility in one round trip
+    result = await db.gallery_images.aggregate([
+        {"$match": {"id": image_id, "project_id": project_id}},
+        {"$lookup": {
+            "from": "projects",
+            "localField": "project_id",
+            "foreignField": "id",
+            "pipeline": [{"$project": {"_id": 0, "user_id": 1, "is_public": 1}}],
+            "as": "_project"
+        }},
+        {"$lookup": {
+            "from": "gallery_folders",
+            "localField": "folder_id",
+            "foreignField": "id",
+            "pipeline": [
+                {"$match": {"project_id": project_id}},
+                {"$project": {"_id": 0, "is_public": 1}}
+            ],
+            "as": "_folder"
+        }},
+        {"$project": {
+            "_id": 0,
+            "folder_id": 1,
+            "project": {"$first": "$_project"},
+            "folder": {"$first": "$_folder"}
+        }}
+    ]).to_list(1)
+    image = result[0] if result else None
+    
+    if len(_gallery_access_cache) >= GALLERY_ACCESS_CACHE_SIZE:
+        _gallery_access_cache.pop(next(iter(_gallery_access_cache)))
+    _gallery_access_cache[key] = (image, now + GALLERY_ACCESS_TTL)
+    return image
+
+
 @router.get("/files/{file_path:path}")
 async def serve_file(
     file_path: str,
@@ -135,28 +233,34 @@ async def serve_file(
     # Get user from either header or query param
     current_user = await get_optional_user(credentials, token)
     
-    full_path = UPLOADS_DIR / file_path
-    
-    if not full_path.exists() or not full_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Security check - ensure path is within uploads directory
-    try:
-        full_path.resolve().relative_to(UPLOADS_DIR.resolve())
-    except ValueError:
+    # Security check - ensure path is within uploads directory, then make sure it is a file
+    real_path, file_stat = await asyncio.to_thread(stat_upload, UPLOADS_DIR / file_path)
+    if real_path is None:
         raise HTTPException(status_code=403, detail="Access denied")
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
     
     # Check gallery image access permissions
-    if file_path.startswith("gallery/"):
+    is_gallery = file_path.startswith("gallery/")
+    if is_gallery:
         has_access = await check_gallery_image_access(file_path, current_user)
         if not has_access:
             raise HTTPException(status_code=403, detail="Access denied - this image is in a private folder")
     
+    # Gallery and blog images are stored under unique names and never rewritten, so browsers may keep
+    # them; gallery images can be access-controlled and must stay out of shared caches. Project covers
+    # are overwritten in place at a fixed name, so they are revalidated through ETag/Last-Modified.
+    if file_path.startswith("projects/"):
+        cache_control = "no-cache"
+    else:
+        cache_control = f"{'private' if is_gallery else 'public'}, max-age=86400"
     return FileResponse(
-        full_path,
+        real_path,
+        stat_result=file_stat,
         headers={
             "Access-Control-Allow-Origin": "*",
-            "Cross-Origin-Resource-Policy": "cross-origin"
+            "Cross-Origin-Resource-Policy": "cross-origin",
+            "Cache-Control": cache_control
         }
     )
 
@@ -168,7 +272,7 @@ async def seed_admin_get():
     from services import hash_password
     from config import logger
     
-    admin_exists = await db.users.find_one({"is_admin": True})
+    admin_exists = await db.users.find_one({"is_admin": True}, {"_id": 1})
     if admin_exists:
         raise HTTPException(status_code=400, detail="Admin user already exists")
     
@@ -2,9 +2,12 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from typing import Optional, List
 from datetime import datetime, timezone
+import asyncio
+import codecs
 import uuid
 import csv
 import io
+import itertools
 import re
 
 from config import db
@@ -16,30 +19,42 @@ from services import get_current_user
 
 router = APIRouter()
 
+# Common date formats to try after the requested one
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%d-%m-%Y",
+    "%m-%d-%Y",
+    "%Y%m%d",
+)
 
-def parse_date(date_str: str, date_format: str = "%Y-%m-%d") -> str:
-    """Parse date string and return ISO format YYYY-MM-DD"""
-    # Common date formats to try
-    formats_to_try = [
-        date_format,
-        "%Y-%m-%d",
-        "%d/%m/%Y",
-        "%m/%d/%Y",
-        "%d.%m.%Y",
-        "%Y/%m/%d",
-        "%d-%m-%Y",
-        "%m-%d-%Y",
-        "%Y%m%d",
-    ]
+CURRENCY_RE = re.compile(r'[€$£¥₹\s]')
+EURO_DECIMAL_RE = re.compile(r'^-?[\d.]*,\d{2}$')
+
+
+def parse_date(date_str: str, date_format: str = "%Y-%m-%d", last_format: Optional[list] = None) -> str:
+    """Parse date string and return ISO format YYYY-MM-DD.
     
+    Pass the same one-element last_format list for every row of a file: the
+    fallback format that matched last is then tried right after date_format,
+    since all rows of an export share one format.
+    """
     date_str = date_str.strip()
     
-    for fmt in formats_to_try:
+    remembered = last_format[0] if last_format else None
+    for fmt in (date_format, remembered, *DATE_FORMATS):
+        if fmt is None:
+            continue
         try:
             dt = datetime.strptime(date_str, fmt)
-            return dt.strftime("%Y-%m-%d")
         except ValueError:
             continue
+        if last_format is not None and fmt != date_format:
+            last_format[0] = fmt
+        return dt.strftime("%Y-%m-%d")
     
     raise ValueError(f"Cannot parse date: {date_str}")
 
@@ -47,7 +62,7 @@ def parse_date(date_str: str, date_format: str = "%Y-%m-%d") -> str:
 def parse_amount(amount_str: str) -> float:
     """Parse amount string handling various formats"""
     # Remove currency symbols and whitespace
-    amount_str = re.sub(r'[€$£¥₹\s]', '', amount_str.strip())
+    amount_str = CURRENCY_RE.sub('', amount_str.strip())
     
     # Handle European format (1.234,56 -> 1234.56)
     if ',' in amount_str and '.' in amount_str:
@@ -61,7 +76,7 @@ def parse_amount(amount_str: str) -> float:
     elif ',' in amount_str:
         # Could be European decimal or US thousands
         # If comma is followed by exactly 2 digits at end, treat as decimal
-        if re.match(r'^-?[\d.]*,\d{2}$', amount_str):
+        if EURO_DECIMAL_RE.match(amount_str):
             amount_str = amount_str.replace(',', '.')
         else:
             amount_str = amount_str.replace(',', '')
@@ -69,6 +84,51 @@ def parse_amount(amount_str: str) -> float:
     return float(amount_str)
 
 
+def detect_upload_encoding(upload) -> str:
+    """Return 'utf-8' if the spooled upload decodes as UTF-8, else 'latin-1'.
+    
+    Decodes in chunks so the file is never held in memory as a whole; leaves
+    the file positioned at the start.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    upload.seek(0)
+    try:
+        while chunk := upload.read(1 << 16):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+        return "utf-8"
+    except UnicodeDecodeError:
+        # Latin-1 maps every byte, so it always decodes
+        return "latin-1"
+    finally:
+        upload.seek(0)
+
+
+def parse_columns_vectorized(raw_dates: List[str], raw_amounts: List[str], date_format: str) -> tuple:
+    """Parse whole date and amount columns at once with pandas.
+    
+    Returns two lists aligned with the input holding the parsed value, or None
+    where the row needs the per-row parse_date/parse_amount fallback (other date
+    formats, amounts with comma separators, unparseable values).
+    """
+    import pandas as pd
+    
+    try:
+        parsed_dates = pd.to_datetime(
+            pd.Series(raw_dates, dtype=object).str.strip(), format=date_format, errors="coerce"
+        ).dt.strftime("%Y-%m-%d")
+        dates = [None if pd.isna(d) else d for d in parsed_dates]
+    except (ValueError, TypeError):
+        dates = [None] * len(raw_dates)
+    
+    # Without a comma parse_amount is a plain float() of the currency-stripped value
+    amount_strs = pd.Series(raw_amounts, dtype=object).str.strip().str.replace(CURRENCY_RE, "", regex=True)
+    parsed_amounts = pd.to_numeric(amount_strs.where(~amount_strs.str.contains(",", regex=False)), errors="coerce")
+    amounts = [None if pd.isna(a) else float(a) for a in parsed_amounts]
+    
+    return dates, amounts
+
+
 @router.post("/preview/csv", response_model=ImportPreviewResponse)
 async def preview_csv_import(
     file: UploadFile = File(...),
@@ -88,37 +148,29 @@ async def preview_csv_import(
     if not file.filename.lower().endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV file")
     
-    content = await file.read()
-    try:
-        text = content.decode('utf-8')
-    except UnicodeDecodeError:
-        try:
-            text = content.decode('latin-1')
-        except:
-            raise HTTPException(status_code=400, detail="Cannot decode file. Please use UTF-8 or Latin-1 encoding.")
+    # Read straight from the spooled upload rather than copying it into memory
+    encoding = await asyncio.to_thread(detect_upload_encoding, file.file)
     
-    # Parse CSV
-    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
-    rows = list(reader)
+    # Parse CSV row by row instead of materializing every row up front
+    reader = csv.reader(io.TextIOWrapper(file.file, encoding=encoding, newline=""), delimiter=delimiter)
+    first_row = next(reader, None)
     
-    if len(rows) == 0:
+    if first_row is None:
         raise HTTPException(status_code=400, detail="CSV file is empty")
     
-    columns = []
-    data_rows = rows
-    
     if has_header:
-        columns = [col.strip() for col in rows[0]]
-        data_rows = rows[1:]
+        columns = [col.strip() for col in first_row]
+        data_rows = reader
     else:
         # Generate column names
-        columns = [f"Column {i+1}" for i in range(len(rows[0]))]
+        columns = [f"Column {i+1}" for i in range(len(first_row))]
+        data_rows = itertools.chain([first_row], reader)
     
     # If no column mappings provided, just return columns for user to map
     if not date_column or not amount_column:
         return ImportPreviewResponse(
             transactions=[],
-            total=len(data_rows),
+            total=sum(1 for _ in data_rows),
             columns=columns,
             warnings=["Please map the date and amount columns to continue."]
         )
@@ -134,15 +186,29 @@ async def preview_csv_import(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Column not found: {str(e)}")
     
+    # Keep only the mapped cells; short rows stay in place (as None) so warnings keep row order
+    cells = []
+    min_cols = max(date_idx, amount_idx, desc_idx or 0) + 1
     for row_num, row in enumerate(data_rows, start=2 if has_header else 1):
-        if len(row) <= max(date_idx, amount_idx, desc_idx or 0):
+        if len(row) < min_cols:
+            cells.append((row_num, None, None, None))
+            continue
+        cells.append((row_num, row[date_idx], row[amount_idx], row[desc_idx] if desc_idx is not None else None))
+    
+    fast_dates, fast_amounts = parse_columns_vectorized(
+        [c[1] or "" for c in cells], [c[2] or "" for c in cells], date_format
+    )
+    
+    last_date_format = [None]
+    for (row_num, raw_date, raw_amount, raw_description), fast_date, fast_amount in zip(cells, fast_dates, fast_amounts):
+        if raw_date is None:
             warnings.append(f"Row {row_num}: Not enough columns, skipping")
             continue
         
         try:
-            date = parse_date(row[date_idx], date_format)
-            amount = parse_amount(row[amount_idx])
-            description = row[desc_idx].strip() if desc_idx is not None else None
+            date = fast_date or parse_date(raw_date, date_format, last_date_format)
+            amount = fast_amount if fast_amount is not None else parse_amount(raw_amount)
+            description = raw_description.strip() if raw_description is not None else None
             
             transactions.append(ImportedTransaction(
                 date=date,
@@ -178,11 +244,11 @@ async def preview_ofx_import(
     except ImportError:
         raise HTTPException(status_code=500, detail="OFX parsing library not installed")
     
-    content = await file.read()
-    
     try:
-        # Try to parse OFX
-        ofx = OfxParser.parse(io.BytesIO(content))
+        # Try to parse OFX; parsing is CPU-bound, keep it off the event loop.
+        # The parser reads the spooled upload directly instead of an in-memory copy
+        await file.seek(0)
+        ofx = await asyncio.to_thread(OfxParser.parse, file.file)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Cannot parse OFX file: {str(e)}")
     
@@ -349,23 +415,21 @@ async def confirm_import(
     current_user: dict = Depends(get_current_user)
 ):
     """Confirm and save imported transactions."""
-    # Verify project access
-    project = await db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]})
+    # Verify project, account and category access concurrently
+    project, account, category = await asyncio.gather(
+        db.projects.find_one({"id": data.project_id, "user_id": current_user["id"]}, {"_id": 1}),
+        db.finance_accounts.find_one({"id": data.account_id, "user_id": current_user["id"]}, {"_id": 1}),
+        db.finance_categories.find_one({"id": data.default_category_id, "user_id": current_user["id"]}, {"_id": 1}),
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Verify account
-    account = await db.finance_accounts.find_one({"id": data.account_id, "user_id": current_user["id"]})
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
-    
-    # Verify category
-    category = await db.finance_categories.find_one({"id": data.default_category_id, "user_id": current_user["id"]})
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
     now = datetime.now(timezone.utc).isoformat()
-    created_count = 0
+    tx_docs = []
     
     for tx in data.transactions:
         tx_id = str(uuid.uuid4())
@@ -379,7 +443,7 @@ async def confirm_import(
         if tx.ref_number:
             notes_parts.append(f"Ref: {tx.ref_number}")
         
-        tx_doc = {
+        tx_docs.append({
             "id": tx_id,
             "user_id": current_user["id"],
             "date": tx.date,
@@ -392,12 +456,13 @@ async def confirm_import(
             "savings_goal_id": None,
             "created_at": now,
             "updated_at": now
-        }
-        
-        await db.finance_transactions.insert_one(tx_doc)
-        created_count += 1
+        })
+    
+    # Write the whole import in one round trip
+    if tx_docs:
+        await db.finance_transactions.insert_many(tx_docs, ordered=False)
     
-    return MessageResponse(message=f"Successfully imported {created_count} transactions")
+    return MessageResponse(message=f"Successfully imported {len(tx_docs)} transactions")
 
 
 @router.get("/sample-csv")
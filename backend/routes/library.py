@@ -1,7 +1,9 @@
 """Library routes."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
+import asyncio
 import uuid
 
 from config import db
@@ -10,7 +12,7 @@ from models import (
     LibraryEntryCreate, LibraryEntryUpdate, LibraryEntryResponse,
     LibraryListResponse, MessageResponse
 )
-from services import get_current_user, verify_project_access
+from services import get_current_user, verify_project_access, search_regex
 
 router = APIRouter()
 
@@ -41,7 +43,8 @@ async def create_library_folder(
     }
     
     await db.library_folders.insert_one(folder_doc)
-    return LibraryFolderResponse(**{k: v for k, v in folder_doc.items() if k != "_id"})
+    folder_doc.pop("_id", None)
+    return LibraryFolderResponse(**folder_doc)
 
 
 @router.get("/projects/{project_id}/library", response_model=LibraryListResponse)
@@ -51,6 +54,8 @@ async def list_library_contents(
     search: Optional[str] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user)
 ):
     await verify_project_access(project_id, current_user["id"])
@@ -61,18 +66,25 @@ async def list_library_contents(
     entry_query = {"project_id": project_id, "folder_id": folder_id}
     
     if search:
-        folder_query["name"] = {"$regex": search, "$options": "i"}
+        search_filter = search_regex(search)
+        folder_query["name"] = search_filter
         entry_query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+            {"title": search_filter},
+            {"description": search_filter}
         ]
     
-    folders = await db.library_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    entries = await db.library_entries.find(entry_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
+    # Folders are few and listed in full; entries are paged, one extra row tells us if more follow
+    folders, entries = await asyncio.gather(
+        db.library_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(None),
+        db.library_entries.find(entry_query, {"_id": 0}).sort(sort_by, sort_direction)
+            .skip(offset).limit(limit + 1).to_list(limit + 1)
+    )
+    has_more = len(entries) > limit
     
     return LibraryListResponse(
         folders=[LibraryFolderResponse(**f) for f in folders],
-        entries=[LibraryEntryResponse(**e) for e in entries]
+        entries=[LibraryEntryResponse(**e) for e in entries[:limit]],
+        has_more=has_more
     )
 
 
@@ -85,15 +97,17 @@ async def update_library_folder(
 ):
     await verify_project_access(project_id, current_user["id"])
     
-    folder = await db.library_folders.find_one({"id": folder_id, "project_id": project_id})
-    if not folder:
-        raise HTTPException(status_code=404, detail="Folder not found")
-    
-    update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    update_data = data.model_dump(exclude_unset=True, exclude_none=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.library_folders.update_one({"id": folder_id}, {"$set": update_data})
-    updated = await db.library_folders.find_one({"id": folder_id}, {"_id": 0})
+    updated = await db.library_folders.find_one_and_update(
+        {"id": folder_id, "project_id": project_id},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Folder not found")
     return LibraryFolderResponse(**updated)
 
 
@@ -105,14 +119,25 @@ async def delete_library_folder(
 ):
     await verify_project_access(project_id, current_user["id"])
     
-    async def delete_folder_recursive(fid: str):
-        subfolders = await db.library_folders.find({"parent_id": fid}).to_list(1000)
-        for subfolder in subfolders:
-            await delete_folder_recursive(subfolder["id"])
-        await db.library_entries.delete_many({"folder_id": fid})
-        await db.library_folders.delete_one({"id": fid})
-    
-    await delete_folder_recursive(folder_id)
+    # Resolve the folder and all its descendants in one round trip
+    tree = await db.library_folders.aggregate([
+        {"$match": {"id": folder_id, "project_id": project_id}},
+        {"$graphLookup": {
+            "from": "library_folders",
+            "startWith": "$id",
+            "connectFromField": "id",
+            "connectToField": "parent_id",
+            "restrictSearchWithMatch": {"project_id": project_id},
+            "as": "descendants"
+        }},
+        {"$project": {"_id": 0, "ids": {"$concatArrays": [["$id"], "$descendants.id"]}}}
+    ]).to_list(1)
+    if tree:
+        folder_ids = tree[0]["ids"]
+        await asyncio.gather(
+            db.library_entries.delete_many({"folder_id": {"$in": folder_ids}}),
+            db.library_folders.delete_many({"id": {"$in": folder_ids}})
+        )
     return MessageResponse(message="Folder and contents deleted")
 
 
@@ -145,7 +170,8 @@ async def create_library_entry(
     }
     
     await db.library_entries.insert_one(entry_doc)
-    return LibraryEntryResponse(**{k: v for k, v in entry_doc.items() if k != "_id"})
+    entry_doc.pop("_id", None)
+    return LibraryEntryResponse(**entry_doc)
 
 
 @router.get("/projects/{project_id}/library/entries/{entry_id}", response_model=LibraryEntryResponse)
@@ -172,15 +198,17 @@ async def update_library_entry(
 ):
     await verify_project_access(project_id, current_user["id"])
     
-    entry = await db.library_entries.find_one({"id": entry_id, "project_id": project_id})
-    if not entry:
-        raise HTTPException(status_code=404, detail="Library entry not found")
-    
-    update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    update_data = data.model_dump(exclude_unset=True, exclude_none=True)
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.library_entries.update_one({"id": entry_id}, {"$set": update_data})
-    updated = await db.library_entries.find_one({"id": entry_id}, {"_id": 0})
+    updated = await db.library_entries.find_one_and_update(
+        {"id": entry_id, "project_id": project_id},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Library entry not found")
     return LibraryEntryResponse(**updated)
 
 
@@ -209,17 +237,26 @@ async def get_library_folder_path(
     """Get the full path of a folder for breadcrumb navigation"""
     await verify_project_access(project_id, current_user["id"])
     
-    path = []
-    current_folder_id = folder_id
+    # Walk up the parent chain server-side instead of one query per level
+    result = await db.library_folders.aggregate([
+        {"$match": {"id": folder_id, "project_id": project_id}},
+        {"$graphLookup": {
+            "from": "library_folders",
+            "startWith": "$parent_id",
+            "connectFromField": "parent_id",
+            "connectToField": "id",
+            "restrictSearchWithMatch": {"project_id": project_id},
+            "depthField": "depth",
+            "as": "ancestors"
+        }},
+        {"$project": {"_id": 0, "id": 1, "name": 1, "ancestors.id": 1, "ancestors.name": 1, "ancestors.depth": 1}}
+    ]).to_list(1)
+    if not result:
+        return {"path": []}
     
-    while current_folder_id:
-        folder = await db.library_folders.find_one(
-            {"id": current_folder_id, "project_id": project_id},
-            {"_id": 0}
-        )
-        if not folder:
-            break
-        path.insert(0, {"id": folder["id"], "name": folder["name"]})
-        current_folder_id = folder.get("parent_id")
+    folder = result[0]
+    ancestors = sorted(folder["ancestors"], key=lambda a: a["depth"], reverse=True)
+    path = [{"id": a["id"], "name": a["name"]} for a in ancestors]
+    path.append({"id": folder["id"], "name": folder["name"]})
     
     return {"path": path}
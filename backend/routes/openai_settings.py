@@ -1,35 +1,84 @@
 """OpenAI Settings routes - User API key management."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timezone
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
+from functools import lru_cache
+from pathlib import Path
 import os
 import base64
+import orjson
 
-from config import db
+from config import db, ROOT_DIR, ENVIRONMENT, logger
 from services import get_current_user
 from services.openai_analyzer import test_openai_connection, OpenAITransactionAnalyzer
 
 router = APIRouter()
 
-# Encryption key for storing API keys (generate if not exists)
-ENCRYPTION_KEY = os.environ.get("OPENAI_ENCRYPTION_KEY")
-if not ENCRYPTION_KEY:
-    # Generate a key and store it - in production this should be in env
-    ENCRYPTION_KEY = Fernet.generate_key().decode()
+# Local fallback for the API key encryption key when OPENAI_ENCRYPTION_KEY is unset (single worker, non-production)
+ENCRYPTION_KEY_FILE = Path(os.environ.get("OPENAI_ENCRYPTION_KEY_FILE", str(ROOT_DIR / ".openai_encryption_key")))
+
+
+def load_or_create_key_file(path: Path) -> bytes:
+    """Read the persisted encryption key, generating it on first use"""
+    try:
+        return path.read_bytes().strip()
+    except FileNotFoundError:
+        pass
     
-fernet = Fernet(ENCRYPTION_KEY.encode() if isinstance(ENCRYPTION_KEY, str) else ENCRYPTION_KEY)
+    # Write the new key privately, then link it into place; linking fails if another process won the race
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(Fernet.generate_key())
+    try:
+        os.link(tmp_path, path)
+        logger.warning(f"OPENAI_ENCRYPTION_KEY is not set; generated a local key in {path}")
+    except FileExistsError:
+        pass
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path.read_bytes().strip()
+
+
+@lru_cache(maxsize=1)
+def get_fernet() -> Fernet:
+    """
+    Build the cipher for stored API keys on first use.
+    Every worker and restart must use the same key or stored keys become undecryptable.
+    """
+    key = os.environ.get("OPENAI_ENCRYPTION_KEY")
+    if not key:
+        workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+        if workers > 1 or ENVIRONMENT == "production":
+            raise RuntimeError(
+                "OPENAI_ENCRYPTION_KEY must be set when running in production or with more than one worker"
+            )
+        key = load_or_create_key_file(ENCRYPTION_KEY_FILE)
+    return Fernet(key.encode() if isinstance(key, str) else key)
+
+ALLOWED_MODELS = frozenset(OpenAITransactionAnalyzer.AVAILABLE_MODELS)
+
+# The model list is static, so it is serialized once at import
+AVAILABLE_MODELS_BODY = orjson.dumps({
+    "models": [
+        {"id": "gpt-4o-mini", "name": "GPT-4o Mini", "description": "Fast and cost-effective"},
+        {"id": "gpt-4o", "name": "GPT-4o", "description": "Best quality, higher cost"},
+        {"id": "gpt-4-turbo", "name": "GPT-4 Turbo", "description": "High quality, balanced cost"},
+        {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo", "description": "Fastest, lowest cost"}
+    ]
+})
 
 
 def encrypt_api_key(api_key: str) -> str:
     """Encrypt API key for storage"""
-    return fernet.encrypt(api_key.encode()).decode()
+    return get_fernet().encrypt(api_key.encode()).decode()
 
 
 def decrypt_api_key(encrypted_key: str) -> str:
     """Decrypt API key for use"""
-    return fernet.decrypt(encrypted_key.encode()).decode()
+    return get_fernet().decrypt(encrypted_key.encode()).decode()
 
 
 class OpenAISettingsRequest(BaseModel):
@@ -52,17 +101,21 @@ class TestKeyResponse(BaseModel):
 @router.get("/openai/settings", response_model=OpenAISettingsResponse)
 async def get_openai_settings(current_user: dict = Depends(get_current_user)):
     """Get current OpenAI settings for the user"""
-    user = await db.users.find_one({"id": current_user["id"]}, {"_id": 0})
+    # get_current_user has just loaded the full user document
+    user = current_user
     
     has_key = bool(user.get("openai_api_key"))
     api_key_preview = None
     
     if has_key:
-        try:
-            decrypted = decrypt_api_key(user["openai_api_key"])
-            api_key_preview = f"...{decrypted[-4:]}"
-        except:
-            api_key_preview = "****"
+        # The preview is stored on save; only keys saved before that need decrypting
+        api_key_preview = user.get("openai_api_key_preview")
+        if not api_key_preview:
+            try:
+                decrypted = decrypt_api_key(user["openai_api_key"])
+                api_key_preview = f"...{decrypted[-4:]}"
+            except InvalidToken:
+                api_key_preview = "****"
     
     return OpenAISettingsResponse(
         has_api_key=has_key,
@@ -79,7 +132,7 @@ async def save_openai_settings(
 ):
     """Save OpenAI API key and model preference"""
     # Validate model
-    if data.model not in OpenAITransactionAnalyzer.AVAILABLE_MODELS:
+    if data.model not in ALLOWED_MODELS:
         raise HTTPException(
             status_code=400, 
             detail=f"Invalid model. Choose from: {', '.join(OpenAITransactionAnalyzer.AVAILABLE_MODELS)}"
@@ -87,6 +140,7 @@ async def save_openai_settings(
     
     # Encrypt the API key
     encrypted_key = encrypt_api_key(data.api_key)
+    api_key_preview = f"...{data.api_key[-4:]}"
     now = datetime.now(timezone.utc).isoformat()
     
     # Update user
@@ -94,6 +148,7 @@ async def save_openai_settings(
         {"id": current_user["id"]},
         {"$set": {
             "openai_api_key": encrypted_key,
+            "openai_api_key_preview": api_key_preview,
             "openai_model": data.model,
             "openai_updated_at": now
         }}
@@ -102,7 +157,7 @@ async def save_openai_settings(
     return OpenAISettingsResponse(
         has_api_key=True,
         model=data.model,
-        api_key_preview=f"...{data.api_key[-4:]}",
+        api_key_preview=api_key_preview,
         last_updated=now
     )
 
@@ -114,6 +169,7 @@ async def delete_openai_settings(current_user: dict = Depends(get_current_user))
         {"id": current_user["id"]},
         {"$unset": {
             "openai_api_key": "",
+            "openai_api_key_preview": "",
             "openai_model": "",
             "openai_updated_at": ""
         }}
@@ -134,11 +190,4 @@ async def test_openai_key(
 @router.get("/openai/models")
 async def get_available_models(current_user: dict = Depends(get_current_user)):
     """Get list of available OpenAI models"""
-    return {
-        "models": [
-            {"id": "gpt-4o-mini", "name": "GPT-4o Mini", "description": "Fast and cost-effective"},
-            {"id": "gpt-4o", "name": "GPT-4o", "description": "Best quality, higher cost"},
-            {"id": "gpt-4-turbo", "name": "GPT-4 Turbo", "description": "High quality, balanced cost"},
-            {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo", "description": "Fastest, lowest cost"}
-        ]
-    }
+    return Response(content=AVAILABLE_MODELS_BODY, media_type="application/json")
@@ -1,12 +1,18 @@
 """Project routes."""
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
+import asyncio
+import os
 import uuid
 
+import aiofiles
+
 from config import db, UPLOADS_DIR, MAX_UPLOAD_SIZE, MAX_UPLOAD_SIZE_MB
 from models import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListResponse, MessageResponse
-from services import get_current_user
+from services import get_current_user, forget_project_access, response_rows, search_regex
 
 router = APIRouter()
 
@@ -28,34 +34,38 @@ async def create_project(data: ProjectCreate, current_user: dict = Depends(get_c
     }
     
     await db.projects.insert_one(project_doc)
+    project_doc.pop("_id", None)
     
-    return ProjectResponse(**{k: v for k, v in project_doc.items() if k != "_id"})
+    return ProjectResponse(**project_doc)
 
 
-@router.get("", response_model=ProjectListResponse)
+@router.get("", responses={200: {"model": ProjectListResponse}})
 async def list_projects(
     search: Optional[str] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user)
 ):
     query = {"user_id": current_user["id"]}
     
     if search:
+        search_filter = search_regex(search)
         query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+            {"name": search_filter},
+            {"description": search_filter}
         ]
     
     sort_direction = -1 if sort_order == "desc" else 1
     
-    total = await db.projects.count_documents(query)
-    projects = await db.projects.find(query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    
-    return ProjectListResponse(
-        projects=[ProjectResponse(**p) for p in projects],
-        total=total
+    total, projects = await asyncio.gather(
+        db.projects.count_documents(query),
+        db.projects.find(query, {"_id": 0}).sort(sort_by, sort_direction).skip(offset).limit(limit).to_list(limit)
     )
+    
+    # Rows are shaped here and serialized directly instead of being validated against the response model
+    return ORJSONResponse({"projects": response_rows(ProjectResponse, projects), "total": total})
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -77,23 +87,30 @@ async def update_project(
     data: ProjectUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    project = await db.projects.find_one(
-        {"id": project_id, "user_id": current_user["id"]}
+    update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    # Update and get the previous version back in one round trip; the old name drives the rename below
+    project = await db.projects.find_one_and_update(
+        {"id": project_id, "user_id": current_user["id"]},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
     )
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    update_data = {k: v for k, v in data.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    
-    await db.projects.update_one(
-        {"id": project_id},
-        {"$set": update_data}
-    )
+    # Keep the project name copied onto tasks, routines and checklists in sync
+    if "name" in update_data and update_data["name"] != project["name"]:
+        rename = {"$set": {"project_name": update_data["name"]}}
+        await asyncio.gather(
+            db.tasks.update_many({"project_id": project_id}, rename),
+            db.routine_tasks.update_many({"project_id": project_id}, rename),
+            db.checklists.update_many({"project_id": project_id}, rename)
+        )
     
-    updated = await db.projects.find_one({"id": project_id}, {"_id": 0})
-    return ProjectResponse(**updated)
+    return ProjectResponse(**{**project, **update_data})
 
 
 @router.delete("/{project_id}", response_model=MessageResponse)
@@ -108,21 +125,25 @@ async def delete_project(project_id: str, current_user: dict = Depends(get_curre
     # Delete project image if exists
     if project.get("image"):
         image_path = UPLOADS_DIR / project["image"].split("/uploads/")[-1]
-        if image_path.exists():
-            image_path.unlink()
-    
-    # Delete all related data
-    await db.diary_entries.delete_many({"project_id": project_id})
-    await db.gallery_folders.delete_many({"project_id": project_id})
-    await db.gallery_images.delete_many({"project_id": project_id})
-    await db.blog_entries.delete_many({"project_id": project_id})
-    await db.library_folders.delete_many({"project_id": project_id})
-    await db.library_entries.delete_many({"project_id": project_id})
-    await db.tasks.delete_many({"project_id": project_id})
-    await db.startup_tasks.delete_many({"project_id": project_id})
-    await db.shutdown_tasks.delete_many({"project_id": project_id})
+        await asyncio.to_thread(image_path.unlink, missing_ok=True)
+    
+    # Delete all related data; the collections are independent so the deletes run concurrently
+    related = {"project_id": project_id}
+    await asyncio.gather(
+        db.diary_entries.delete_many(related),
+        db.gallery_folders.delete_many(related),
+        db.gallery_images.delete_many(related),
+        db.blog_entries.delete_many(related),
+        db.library_folders.delete_many(related),
+        db.library_entries.delete_many(related),
+        db.tasks.delete_many(related),
+        db.startup_tasks.delete_many(related),
+        db.shutdown_tasks.delete_many(related)
+    )
     
+    # The project itself goes last so a failed cascade can be retried
     await db.projects.delete_one({"id": project_id})
+    forget_project_access(project_id, current_user["id"])
     
     return MessageResponse(message="Project deleted successfully")
 
@@ -144,32 +165,36 @@ async def upload_project_image(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Invalid file type. Allowed: JPEG, PNG, GIF, WEBP")
     
-    # Check file size
-    content = await file.read()
-    if len(content) > MAX_UPLOAD_SIZE:
+    project_dir = UPLOADS_DIR / "projects" / project_id
+    await asyncio.to_thread(project_dir.mkdir, parents=True, exist_ok=True)
+    
+    file_ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
+    filename = f"cover.{file_ext}"
+    file_path = project_dir / filename
+    
+    # Stream to a temporary file in chunks, checking the size as we go, so the current cover survives a rejected upload
+    part_path = project_dir / f"{filename}.part"
+    total = 0
+    too_large = False
+    async with aiofiles.open(part_path, "wb") as f:
+        while chunk := await file.read(1 << 20):
+            total += len(chunk)
+            if total > MAX_UPLOAD_SIZE:
+                too_large = True
+                break
+            await f.write(chunk)
+    if too_large:
+        await asyncio.to_thread(part_path.unlink, missing_ok=True)
         raise HTTPException(
             status_code=413, 
             detail=f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB}MB"
         )
-    # Reset file position for later use
-    await file.seek(0)
-    
-    project_dir = UPLOADS_DIR / "projects" / project_id
-    project_dir.mkdir(parents=True, exist_ok=True)
     
     if project.get("image"):
         old_path = UPLOADS_DIR / project["image"].split("/uploads/")[-1]
-        if old_path.exists():
-            old_path.unlink()
-    
-    file_ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    filename = f"cover.{file_ext}"
-    file_path = project_dir / filename
-    
-    # Content already read for size check, read again
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+        if old_path != file_path:
+            await asyncio.to_thread(old_path.unlink, missing_ok=True)
+    await asyncio.to_thread(os.replace, part_path, file_path)
     
     image_url = f"/uploads/projects/{project_id}/{filename}"
     await db.projects.update_one(
@@ -1,18 +1,79 @@
 """Public routes."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 from datetime import datetime, timezone
+from collections import defaultdict
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
 
-from config import db
+from config import db, logger
 from models import (
-    ProjectResponse, ProjectListResponse, BlogEntryResponse, BlogListResponse,
+    ProjectResponse, ProjectListResponse, BlogEntryResponse, BlogImageResponse, BlogListResponse,
     LibraryFolderResponse, LibraryEntryResponse, LibraryListResponse,
     GalleryFolderResponse, GalleryImageResponse, PublicGalleryResponse,
     PublicUserProfileResponse
 )
+from services import response_row, response_rows, search_regex
 
 router = APIRouter()
 
+# Public project views are counted in memory and written in one bulk write per interval:
+# project_id -> [views, last_viewed]
+PROJECT_VIEWS_FLUSH_INTERVAL = 5
+_pending_views = {}
+_views_flusher = None
+
+
+async def flush_project_views():
+    """Write the buffered public project views to project_views"""
+    global _pending_views
+    if not _pending_views:
+        return
+    pending, _pending_views = _pending_views, {}
+    batch = list(pending.items())
+    try:
+        await db.project_views.bulk_write([
+            UpdateOne({"project_id": pid}, {"$inc": {"views": views}, "$set": {"last_viewed": last_viewed}}, upsert=True)
+            for pid, (views, last_viewed) in batch
+        ], ordered=False)
+    except BulkWriteError as e:
+        # Unordered, so every other update was applied; only the failed ones go back for the next flush
+        requeue_project_views(batch[err["index"]] for err in e.details.get("writeErrors", []))
+        raise
+    except Exception:
+        # Nothing is known to be written, put all views back so the next flush retries them
+        requeue_project_views(batch)
+        raise
+
+
+def requeue_project_views(entries):
+    """Merge unwritten (project_id, [views, last_viewed]) entries back into the pending views"""
+    for pid, (views, last_viewed) in entries:
+        entry = _pending_views.setdefault(pid, [0, last_viewed])
+        entry[0] += views
+
+
+async def flush_project_views_periodically():
+    """Background loop flushing buffered project views every PROJECT_VIEWS_FLUSH_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(PROJECT_VIEWS_FLUSH_INTERVAL)
+        try:
+            await flush_project_views()
+        except Exception as e:
+            logger.warning(f"Flushing project views failed, retrying next interval: {e}")
+
+
+def record_project_view(project_id: str):
+    """Count a public project view; the write happens in the next flush"""
+    global _views_flusher
+    entry = _pending_views.setdefault(project_id, [0, None])
+    entry[0] += 1
+    entry[1] = datetime.now(timezone.utc).isoformat()
+    if _views_flusher is None or _views_flusher.done():
+        _views_flusher = asyncio.create_task(flush_project_views_periodically())
+
 
 @router.get("/users/{user_id}/profile", response_model=PublicUserProfileResponse)
 async def get_public_user_profile(user_id: str):
@@ -33,29 +94,32 @@ async def get_public_user_profile(user_id: str):
     )
 
 
-@router.get("/projects", response_model=ProjectListResponse)
+@router.get("/projects", responses={200: {"model": ProjectListResponse}})
 async def list_public_projects(
     search: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
 ):
     query = {"is_public": True}
     
     if search:
+        search_filter = search_regex(search)
         query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+            {"name": search_filter},
+            {"description": search_filter}
         ]
     
     sort_direction = -1 if sort_order == "desc" else 1
     
-    total = await db.projects.count_documents(query)
-    projects = await db.projects.find(query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    
-    return ProjectListResponse(
-        projects=[ProjectResponse(**p) for p in projects],
-        total=total
+    total, projects = await asyncio.gather(
+        db.projects.count_documents(query),
+        db.projects.find(query, {"_id": 0}).sort(sort_by, sort_direction).skip(offset).limit(limit).to_list(limit)
     )
+    
+    # Rows are shaped here and serialized directly instead of being validated against the response model
+    return ORJSONResponse({"projects": response_rows(ProjectResponse, projects), "total": total})
 
 
 @router.get("/projects/{project_id}", response_model=ProjectResponse)
@@ -68,11 +132,7 @@ async def get_public_project(project_id: str):
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    await db.project_views.update_one(
-        {"project_id": project_id},
-        {"$inc": {"views": 1}, "$set": {"last_viewed": datetime.now(timezone.utc).isoformat()}},
-        upsert=True
-    )
+    record_project_view(project_id)
     
     return ProjectResponse(**project)
 
@@ -83,30 +143,32 @@ async def get_blog_images(blog_id: str) -> list:
     return images
 
 
-async def build_blog_response(entry: dict) -> BlogEntryResponse:
-    """Build a blog entry response with images"""
-    from models import BlogImageResponse
-    images = await get_blog_images(entry["id"])
-    return BlogEntryResponse(
+async def build_blog_response(entry: dict, images: Optional[list] = None) -> BlogEntryResponse:
+    """Build a blog entry response with images, fetching them unless already given"""
+    if images is None:
+        images = await get_blog_images(entry["id"])
+    return BlogEntryResponse.model_construct(
         id=entry["id"],
         project_id=entry["project_id"],
         title=entry["title"],
         description=entry["description"],
         is_public=entry.get("is_public", False),
         views=entry.get("views", 0),
-        images=[BlogImageResponse(**img) for img in images],
+        images=[BlogImageResponse.model_construct(**img) for img in images],
         created_at=entry["created_at"],
         updated_at=entry["updated_at"]
     )
 
 
 # Public Blog routes
-@router.get("/projects/{project_id}/blog", response_model=BlogListResponse)
+@router.get("/projects/{project_id}/blog", responses={200: {"model": BlogListResponse}})
 async def list_public_blog_entries(
     project_id: str,
     search: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
 ):
     project = await db.projects.find_one({"id": project_id, "is_public": True})
     if not project:
@@ -114,36 +176,52 @@ async def list_public_blog_entries(
     
     query = {"project_id": project_id, "is_public": True}
     if search:
+        search_filter = search_regex(search)
         query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+            {"title": search_filter},
+            {"description": search_filter}
         ]
     
     sort_direction = -1 if sort_order == "desc" else 1
-    total = await db.blog_entries.count_documents(query)
-    entries = await db.blog_entries.find(query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    
-    # Build responses with images
-    responses = []
-    for entry in entries:
-        responses.append(await build_blog_response(entry))
+    total, entries = await asyncio.gather(
+        db.blog_entries.count_documents(query),
+        db.blog_entries.find(query, {"_id": 0}).sort(sort_by, sort_direction).skip(offset).limit(limit).to_list(limit)
+    )
     
-    return BlogListResponse(entries=responses, total=total)
+    # Fetch the images of all entries in one query and group them per entry
+    images_by_blog = defaultdict(list)
+    if entries:
+        images = await db.blog_images.find(
+            {"blog_id": {"$in": [e["id"] for e in entries]}},
+            {"_id": 0}
+        ).to_list(None)
+        for img in images:
+            images_by_blog[img["blog_id"]].append(img)
+    
+    # Rows are shaped here and serialized directly instead of being validated against the response model
+    responses = [
+        response_row(BlogEntryResponse, {**entry, "images": response_rows(BlogImageResponse, images_by_blog[entry["id"]])})
+        for entry in entries
+    ]
+    return ORJSONResponse({"entries": responses, "total": total})
 
 
 @router.get("/projects/{project_id}/blog/{entry_id}", response_model=BlogEntryResponse)
 async def get_public_blog_entry(project_id: str, entry_id: str):
-    project = await db.projects.find_one({"id": project_id, "is_public": True})
+    project = await db.projects.find_one({"id": project_id, "is_public": True}, {"_id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    entry = await db.blog_entries.find_one({"id": entry_id, "project_id": project_id, "is_public": True}, {"_id": 0})
+    # Count the view and read the entry back in one round trip
+    entry = await db.blog_entries.find_one_and_update(
+        {"id": entry_id, "project_id": project_id, "is_public": True},
+        {"$inc": {"views": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
     if not entry:
         raise HTTPException(status_code=404, detail="Blog entry not found")
     
-    await db.blog_entries.update_one({"id": entry_id}, {"$inc": {"views": 1}})
-    entry["views"] = entry.get("views", 0) + 1
-    
     return await build_blog_response(entry)
 
 
@@ -154,7 +232,9 @@ async def list_public_library_contents(
     folder_id: Optional[str] = None,
     search: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
 ):
     project = await db.projects.find_one({"id": project_id, "is_public": True})
     if not project:
@@ -166,70 +246,88 @@ async def list_public_library_contents(
     entry_query = {"project_id": project_id, "folder_id": folder_id, "is_public": True}
     
     if search:
-        folder_query["name"] = {"$regex": search, "$options": "i"}
+        search_filter = search_regex(search)
+        folder_query["name"] = search_filter
         entry_query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
+            {"title": search_filter},
+            {"description": search_filter}
         ]
     
-    folders = await db.library_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    entries = await db.library_entries.find(entry_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
+    # Folders are few and listed in full; entries are paged, one extra row tells us if more follow
+    folders, entries = await asyncio.gather(
+        db.library_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(None),
+        db.library_entries.find(entry_query, {"_id": 0}).sort(sort_by, sort_direction)
+            .skip(offset).limit(limit + 1).to_list(limit + 1)
+    )
+    has_more = len(entries) > limit
     
     return LibraryListResponse(
         folders=[LibraryFolderResponse(**f) for f in folders],
-        entries=[LibraryEntryResponse(**e) for e in entries]
+        entries=[LibraryEntryResponse(**e) for e in entries[:limit]],
+        has_more=has_more
     )
 
 
 @router.get("/projects/{project_id}/library/entries/{entry_id}", response_model=LibraryEntryResponse)
 async def get_public_library_entry(project_id: str, entry_id: str):
-    project = await db.projects.find_one({"id": project_id, "is_public": True})
+    project = await db.projects.find_one({"id": project_id, "is_public": True}, {"_id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    entry = await db.library_entries.find_one({"id": entry_id, "project_id": project_id, "is_public": True}, {"_id": 0})
+    # Count the view and read the entry back in one round trip
+    entry = await db.library_entries.find_one_and_update(
+        {"id": entry_id, "project_id": project_id, "is_public": True},
+        {"$inc": {"views": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
     if not entry:
         raise HTTPException(status_code=404, detail="Library entry not found")
     
-    await db.library_entries.update_one({"id": entry_id}, {"$inc": {"views": 1}})
-    entry["views"] = entry.get("views", 0) + 1
-    
     return LibraryEntryResponse(**entry)
 
 
 # Public Gallery routes
-@router.get("/projects/{project_id}/gallery", response_model=PublicGalleryResponse)
+@router.get("/projects/{project_id}/gallery", responses={200: {"model": PublicGalleryResponse}})
 async def list_public_gallery(
     project_id: str,
     folder_id: Optional[str] = None,
     search: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    limit: int = Query(1000, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
 ):
     """Get public gallery folders and their images for a public project"""
-    project = await db.projects.find_one({"id": project_id, "is_public": True})
+    project = await db.projects.find_one({"id": project_id, "is_public": True}, {"_id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     sort_direction = -1 if sort_order == "desc" else 1
     
-    folder_query = {"project_id": project_id, "is_public": True}
-    if folder_id:
-        folder_query["parent_id"] = folder_id
-    else:
-        folder_query["parent_id"] = None
-    
+    folder_query = {"parent_id": folder_id or None}
     if search:
-        folder_query["name"] = {"$regex": search, "$options": "i"}
-    
-    folders = await db.gallery_folders.find(folder_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    
-    public_folder_ids = [f["id"] for f in await db.gallery_folders.find({"project_id": project_id, "is_public": True}, {"_id": 0, "id": 1}).to_list(1000)]
+        folder_query["name"] = search_regex(search)
+    
+    # One pass over the project's public folders yields both the listed folders and every public folder id
+    result = await db.gallery_folders.aggregate([
+        {"$match": {"project_id": project_id, "is_public": True}},
+        {"$facet": {
+            "folders": [
+                {"$match": folder_query},
+                {"$sort": {sort_by: sort_direction}},
+                {"$project": {"_id": 0}}
+            ],
+            "public_ids": [{"$project": {"_id": 0, "id": 1}}]
+        }}
+    ]).to_list(1)
+    folders = result[0]["folders"]
+    public_folder_ids = [f["id"] for f in result[0]["public_ids"]]
     
     image_query = {"project_id": project_id}
     if folder_id:
         if folder_id not in public_folder_ids:
-            return PublicGalleryResponse(folders=[], images=[])
+            return ORJSONResponse({"folders": [], "images": [], "has_more": False})
         image_query["folder_id"] = folder_id
     else:
         image_query["$or"] = [
@@ -238,11 +336,15 @@ async def list_public_gallery(
         ]
     
     if search:
-        image_query["filename"] = {"$regex": search, "$options": "i"}
-    
-    images = await db.gallery_images.find(image_query, {"_id": 0}).sort(sort_by, sort_direction).to_list(1000)
-    
-    return PublicGalleryResponse(
-        folders=[GalleryFolderResponse(**{**f, "is_public": f.get("is_public", False)}) for f in folders],
-        images=[GalleryImageResponse(**i) for i in images]
-    )
+        image_query["filename"] = search_regex(search)
+    
+    # Images are paged, one extra row tells us if more follow
+    images = await db.gallery_images.find(image_query, {"_id": 0}).sort(sort_by, sort_direction).skip(offset).limit(limit + 1).to_list(limit + 1)
+    has_more = len(images) > limit
+    
+    # Rows are shaped here and serialized directly instead of being validated against the response model
+    return ORJSONResponse({
+        "folders": response_rows(GalleryFolderResponse, folders),
+        "images": response_rows(GalleryImageResponse, images[:limit]),
+        "has_more": has_more
+    })
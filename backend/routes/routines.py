@@ -1,14 +1,17 @@
 """Routine routes."""
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import uuid
 
 from config import db
 from models import (
-    RoutineTaskCreate, RoutineTaskUpdate, RoutineTaskResponse,
+    RoutineType, RoutineTaskCreate, RoutineTaskUpdate, RoutineTaskResponse,
     RoutineListResponse, MessageResponse
 )
-from services import get_current_user, verify_project_access
+from services import get_current_user, verify_project_access, response_rows
 
 router = APIRouter()
 
@@ -16,28 +19,40 @@ router = APIRouter()
 @router.post("/projects/{project_id}/routines/{routine_type}", response_model=RoutineTaskResponse)
 async def create_routine_task(
     project_id: str,
-    routine_type: str,
+    routine_type: RoutineType,
     data: RoutineTaskCreate,
     current_user: dict = Depends(get_current_user)
 ):
-    if routine_type not in ["startup", "shutdown"]:
-        raise HTTPException(status_code=400, detail="Invalid routine type")
-    
-    await verify_project_access(project_id, current_user["id"])
+    # Read ownership and the name fresh: the name is copied onto the new document
+    project = await db.projects.find_one(
+        {"id": project_id, "user_id": current_user["id"]},
+        {"_id": 0, "name": 1}
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     task_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
-    max_order_doc = await db.routine_tasks.find_one(
-        {"project_id": project_id, "routine_type": routine_type},
-        sort=[("order", -1)]
+    # Reserve the next order slot atomically; an explicit order only moves the
+    # counter forward so later appends land after it
+    if data.order == 0:
+        counter_update = {"$inc": {"next_order": 1}}
+    else:
+        counter_update = {"$max": {"next_order": data.order + 1}}
+    counter = await db.routine_counters.find_one_and_update(
+        {"_id": {"project_id": project_id, "routine_type": routine_type.value}},
+        counter_update,
+        upsert=True,
+        return_document=ReturnDocument.AFTER
     )
-    next_order = (max_order_doc["order"] + 1) if max_order_doc else 0
+    next_order = counter["next_order"] - 1
     
     task_doc = {
         "id": task_id,
         "project_id": project_id,
-        "routine_type": routine_type,
+        "project_name": project["name"],
+        "routine_type": routine_type.value,
         "title": data.title,
         "description": data.description,
         "order": data.order if data.order != 0 else next_order,
@@ -45,87 +60,79 @@ async def create_routine_task(
     }
     
     await db.routine_tasks.insert_one(task_doc)
-    return RoutineTaskResponse(**{k: v for k, v in task_doc.items() if k != "_id"})
+    task_doc.pop("_id", None)
+    return RoutineTaskResponse(**task_doc)
 
 
-@router.get("/projects/{project_id}/routines/{routine_type}", response_model=RoutineListResponse)
+@router.get("/projects/{project_id}/routines/{routine_type}", responses={200: {"model": RoutineListResponse}})
 async def list_routine_tasks(
     project_id: str,
-    routine_type: str,
+    routine_type: RoutineType,
     current_user: dict = Depends(get_current_user)
 ):
-    if routine_type not in ["startup", "shutdown"]:
-        raise HTTPException(status_code=400, detail="Invalid routine type")
-    
     await verify_project_access(project_id, current_user["id"])
     
     tasks = await db.routine_tasks.find(
-        {"project_id": project_id, "routine_type": routine_type},
+        {"project_id": project_id, "routine_type": routine_type.value},
         {"_id": 0}
     ).sort("order", 1).to_list(1000)
     
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
     completions = await db.routine_completions.find(
-        {"completed_date": today},
-        {"_id": 0}
-    ).to_list(1000)
+        {"task_id": {"$in": [t["id"] for t in tasks]}, "completed_date": today},
+        {"_id": 0, "task_id": 1}
+    ).to_list(None) if tasks else []
     
-    task_ids = [t["id"] for t in tasks]
-    completions_today = [c["task_id"] for c in completions if c["task_id"] in task_ids]
+    completions_today = [c["task_id"] for c in completions]
     
-    return RoutineListResponse(
-        tasks=[RoutineTaskResponse(**t) for t in tasks],
-        completions_today=completions_today
-    )
+    # Rows are shaped here and serialized directly instead of being validated against the response model
+    return ORJSONResponse({
+        "tasks": response_rows(RoutineTaskResponse, tasks),
+        "completions_today": completions_today
+    })
 
 
 @router.put("/projects/{project_id}/routines/{routine_type}/{task_id}", response_model=RoutineTaskResponse)
 async def update_routine_task(
     project_id: str,
-    routine_type: str,
+    routine_type: RoutineType,
     task_id: str,
     data: RoutineTaskUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    if routine_type not in ["startup", "shutdown"]:
-        raise HTTPException(status_code=400, detail="Invalid routine type")
-    
     await verify_project_access(project_id, current_user["id"])
     
-    task = await db.routine_tasks.find_one({
-        "id": task_id,
-        "project_id": project_id,
-        "routine_type": routine_type
-    })
-    
-    if not task:
-        raise HTTPException(status_code=404, detail="Routine task not found")
-    
+    task_filter = {"id": task_id, "project_id": project_id, "routine_type": routine_type.value}
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     
     if update_data:
-        await db.routine_tasks.update_one({"id": task_id}, {"$set": update_data})
-    
-    updated = await db.routine_tasks.find_one({"id": task_id}, {"_id": 0})
+        updated = await db.routine_tasks.find_one_and_update(
+            task_filter,
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated = await db.routine_tasks.find_one(task_filter, {"_id": 0})
+    
+    if not updated:
+        raise HTTPException(status_code=404, detail="Routine task not found")
     return RoutineTaskResponse(**updated)
 
 
 @router.delete("/projects/{project_id}/routines/{routine_type}/{task_id}", response_model=MessageResponse)
 async def delete_routine_task(
     project_id: str,
-    routine_type: str,
+    routine_type: RoutineType,
     task_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    if routine_type not in ["startup", "shutdown"]:
-        raise HTTPException(status_code=400, detail="Invalid routine type")
-    
     await verify_project_access(project_id, current_user["id"])
     
     result = await db.routine_tasks.delete_one({
         "id": task_id,
         "project_id": project_id,
-        "routine_type": routine_type
+        "routine_type": routine_type.value
     })
     
     if result.deleted_count == 0:
@@ -139,25 +146,23 @@ async def delete_routine_task(
 @router.post("/projects/{project_id}/routines/{routine_type}/{task_id}/complete", response_model=MessageResponse)
 async def complete_routine_task(
     project_id: str,
-    routine_type: str,
+    routine_type: RoutineType,
     task_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    if routine_type not in ["startup", "shutdown"]:
-        raise HTTPException(status_code=400, detail="Invalid routine type")
-    
     await verify_project_access(project_id, current_user["id"])
     
     task = await db.routine_tasks.find_one({
         "id": task_id,
         "project_id": project_id,
-        "routine_type": routine_type
+        "routine_type": routine_type.value
     })
     
     if not task:
         raise HTTPException(status_code=404, detail="Routine task not found")
     
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
     
     existing = await db.routine_completions.find_one({
         "task_id": task_id,
@@ -168,14 +173,17 @@ async def complete_routine_task(
         return MessageResponse(message="Task already completed today")
     
     completion_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
     
-    await db.routine_completions.insert_one({
-        "id": completion_id,
-        "task_id": task_id,
-        "completed_date": today,
-        "created_at": now
-    })
+    # A concurrent completion of the same task may win the race to the unique (task_id, completed_date) index
+    try:
+        await db.routine_completions.insert_one({
+            "id": completion_id,
+            "task_id": task_id,
+            "completed_date": today,
+            "created_at": now.isoformat()
+        })
+    except DuplicateKeyError:
+        return MessageResponse(message="Task already completed today")
     
     return MessageResponse(message="Task marked as complete")
 
@@ -183,13 +191,10 @@ async def complete_routine_task(
 @router.delete("/projects/{project_id}/routines/{routine_type}/{task_id}/complete", response_model=MessageResponse)
 async def uncomplete_routine_task(
     project_id: str,
-    routine_type: str,
+    routine_type: RoutineType,
     task_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    if routine_type not in ["startup", "shutdown"]:
-        raise HTTPException(status_code=400, detail="Invalid routine type")
-    
     await verify_project_access(project_id, current_user["id"])
     
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
@@ -17,7 +17,13 @@ async def create_task(
     data: TaskCreate,
     current_user: dict = Depends(get_current_user)
 ):
-    await verify_project_access(project_id, current_user["id"])
+    # Read ownership and the name fresh: the name is copied onto the new document
+    project = await db.projects.find_one(
+        {"id": project_id, "user_id": current_user["id"]},
+        {"_id": 0, "name": 1}
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     task_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
@@ -25,6 +31,7 @@ async def create_task(
     task_doc = {
         "id": task_id,
         "project_id": project_id,
+        "project_name": project["name"],
         "title": data.title,
         "description": data.description,
         "task_datetime": data.task_datetime,
@@ -35,7 +42,8 @@ async def create_task(
     }
     
     await db.tasks.insert_one(task_doc)
-    return TaskResponse(**{k: v for k, v in task_doc.items() if k != "_id"})
+    task_doc.pop("_id", None)
+    return TaskResponse(**task_doc)
 
 
 @router.get("/projects/{project_id}/tasks", response_model=TaskListResponse)
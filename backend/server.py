@@ -5,6 +5,9 @@ A full-stack application for managing self-sufficient lifestyle projects,
 including diary entries, galleries, blogs, libraries, tasks, and daily routines.
 """
 from fastapi import FastAPI, Response, Request
+from fastapi.responses import ORJSONResponse
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -12,11 +15,13 @@ import os
 
 from config import APP_NAME, UPLOADS_DIR, db, logger
 from routes import api_router
+from routes.public import flush_project_views
+from routes.openai_settings import get_fernet
 from services import hash_password
 
 
-# Create the main app
-app = FastAPI(title=APP_NAME)
+# Create the main app (orjson serializes large list responses much faster than stdlib json)
+app = FastAPI(title=APP_NAME, default_response_class=ORJSONResponse)
 
 
 # Custom middleware to ensure CORS headers on ALL responses
@@ -67,9 +72,179 @@ app.mount("/uploads", StaticFiles(directory=str(UPLOADS_DIR)), name="uploads")
 app.include_router(api_router)
 
 
+async def ensure_indexes():
+    """Create the indexes backing the hot query shapes (no-op when they already exist)"""
+    # Finance: every query is scoped by user plus project/account/category, sorted by date
+    await db.finance_transactions.create_index("id", unique=True)
+    await db.finance_transactions.create_index([("user_id", 1), ("project_id", 1), ("date", -1)])
+    await db.finance_transactions.create_index([("user_id", 1), ("account_id", 1), ("date", -1)])
+    await db.finance_transactions.create_index([("user_id", 1), ("category_id", 1), ("date", -1)])
+    await db.finance_transactions.create_index([("user_id", 1), ("savings_goal_id", 1)])
+    # $lookup joins resolve goal progress by savings_goal_id and project names by id
+    await db.finance_transactions.create_index("savings_goal_id")
+    await db.projects.create_index("id", unique=True)
+    for collection in (db.finance_accounts, db.finance_categories, db.finance_savings_goals):
+        await collection.create_index("id", unique=True)
+    await db.finance_categories.create_index([("user_id", 1), ("project_id", 1)])
+    await db.finance_savings_goals.create_index([("user_id", 1), ("project_id", 1)])
+    # Carries every field list_accounts returns so the listing is served from the index alone
+    await db.finance_accounts.create_index([
+        ("user_id", 1), ("project_id", 1), ("id", 1), ("name", 1), ("type", 1),
+        ("starting_balance", 1), ("notes", 1), ("created_at", 1), ("updated_at", 1)
+    ])
+    # Category seeding and creation rely on this constraint, so older duplicates are merged first
+    await merge_duplicate_categories()
+    await db.finance_categories.create_index(
+        [("user_id", 1), ("project_id", 1), ("name", 1)], unique=True
+    )
+    
+    await db.users.create_index("id", unique=True)
+    
+    # Projects are listed per owner or publicly, newest first
+    await db.projects.create_index([("user_id", 1), ("created_at", -1)])
+    await db.projects.create_index([("is_public", 1), ("created_at", -1)])
+    
+    # Gallery: listings by project and parent folder, $graphLookup walks over id and parent_id
+    await db.gallery_folders.create_index("id", unique=True)
+    await db.gallery_folders.create_index([("project_id", 1), ("parent_id", 1)])
+    await db.gallery_folders.create_index("parent_id")
+    await db.gallery_folders.create_index([("project_id", 1), ("is_public", 1), ("parent_id", 1)])
+    await db.gallery_images.create_index("id", unique=True)
+    await db.gallery_images.create_index([("project_id", 1), ("folder_id", 1)])
+    await db.gallery_images.create_index("folder_id")
+    
+    # Library mirrors the gallery folder tree
+    await db.library_folders.create_index("id", unique=True)
+    await db.library_folders.create_index([("project_id", 1), ("parent_id", 1)])
+    await db.library_folders.create_index("parent_id")
+    await db.library_entries.create_index("id", unique=True)
+    await db.library_entries.create_index([("project_id", 1), ("folder_id", 1)])
+    await db.library_entries.create_index("folder_id")
+    
+    # Blog entries are listed per project (public ones for visitors), newest first
+    await db.blog_entries.create_index("id", unique=True)
+    await db.blog_entries.create_index([("project_id", 1), ("is_public", 1), ("created_at", -1)])
+    # Blog images are fetched per entry and batched with $in for listings
+    await db.blog_images.create_index("blog_id")
+    
+    # Routines are listed in order per project and type; completions are looked up per task and day
+    await db.routine_tasks.create_index([("project_id", 1), ("routine_type", 1), ("order", 1)])
+    try:
+        await db.routine_completions.create_index([("task_id", 1), ("completed_date", 1)], unique=True)
+    except OperationFailure as e:
+        logger.warning(f"Unique routine completion index not created, remove duplicate completions first: {e}")
+
+
+async def merge_duplicate_categories():
+    """Fold categories sharing a user, project and name (allowed before names were unique) into the oldest one"""
+    duplicates = await db.finance_categories.aggregate([
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "project_id": "$project_id", "name": "$name"},
+            "ids": {"$push": "$id"}
+        }},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True).to_list(None)
+    if not duplicates:
+        return
+    
+    for group in duplicates:
+        keep, extra = group["ids"][0], group["ids"][1:]
+        # Repoint everything filed under a duplicate before removing it
+        for collection in (db.finance_transactions, db.expected_items):
+            await collection.update_many({"category_id": {"$in": extra}}, {"$set": {"category_id": keep}})
+        await db.finance_categories.delete_many({"id": {"$in": extra}})
+    logger.info(f"Merged duplicate finance categories in {len(duplicates)} groups")
+
+
+async def backfill_checklist_item_owners():
+    """Copy the owning user_id from each checklist onto items created before it was stored there"""
+    checklist_ids = await db.checklist_items.distinct("checklist_id", {"user_id": {"$exists": False}})
+    if not checklist_ids:
+        return
+    
+    checklists = await db.checklists.find(
+        {"id": {"$in": checklist_ids}}, {"_id": 0, "id": 1, "user_id": 1}
+    ).to_list(None)
+    for checklist in checklists:
+        await db.checklist_items.update_many(
+            {"checklist_id": checklist["id"], "user_id": {"$exists": False}},
+            {"$set": {"user_id": checklist["user_id"]}}
+        )
+    logger.info(f"Backfilled user_id on items of {len(checklists)} checklists")
+
+
+async def backfill_checklist_next_order():
+    """Seed the item order counter on checklists created before it existed"""
+    checklist_ids = await db.checklists.distinct("id", {"next_order": {"$exists": False}})
+    if not checklist_ids:
+        return
+    
+    max_orders = await db.checklist_items.aggregate([
+        {"$match": {"checklist_id": {"$in": checklist_ids}}},
+        {"$group": {"_id": "$checklist_id", "max_order": {"$max": "$order"}}}
+    ]).to_list(None)
+    max_order_map = {m["_id"]: m["max_order"] for m in max_orders}
+    
+    for checklist_id in checklist_ids:
+        await db.checklists.update_one(
+            {"id": checklist_id, "next_order": {"$exists": False}},
+            {"$set": {"next_order": max_order_map.get(checklist_id, 0)}}
+        )
+    logger.info(f"Backfilled next_order on {len(checklist_ids)} checklists")
+
+
+async def backfill_routine_counters():
+    """Seed the per-project routine order counters from routines created before they existed"""
+    if await db.routine_counters.estimated_document_count():
+        return
+    
+    max_orders = await db.routine_tasks.aggregate([
+        {"$group": {
+            "_id": {"project_id": "$project_id", "routine_type": "$routine_type"},
+            "max_order": {"$max": "$order"}
+        }}
+    ]).to_list(None)
+    if not max_orders:
+        return
+    
+    await db.routine_counters.bulk_write([
+        UpdateOne({"_id": m["_id"]}, {"$max": {"next_order": m["max_order"] + 1}}, upsert=True)
+        for m in max_orders
+    ], ordered=False)
+    logger.info(f"Backfilled routine order counters for {len(max_orders)} routines")
+
+
+async def backfill_project_names():
+    """Copy the project name onto tasks, routines and checklists created before it was stored there"""
+    for collection in (db.tasks, db.routine_tasks, db.checklists):
+        project_ids = await collection.distinct("project_id", {"project_name": {"$exists": False}})
+        if not project_ids:
+            continue
+        
+        projects = await db.projects.find(
+            {"id": {"$in": project_ids}}, {"_id": 0, "id": 1, "name": 1}
+        ).to_list(None)
+        for project in projects:
+            await collection.update_many(
+                {"project_id": project["id"], "project_name": {"$exists": False}},
+                {"$set": {"project_name": project["name"]}}
+            )
+        logger.info(f"Backfilled project_name in {collection.name} for {len(projects)} projects")
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Seed admin user on startup if configured"""
+    """Ensure indexes, backfill denormalized fields and seed admin user on startup if configured"""
+    # Fail fast on a missing API key encryption key instead of on the first settings request
+    get_fernet()
+    
+    await ensure_indexes()
+    await backfill_checklist_item_owners()
+    await backfill_checklist_next_order()
+    await backfill_routine_counters()
+    await backfill_project_names()
+    
     admin_email = os.environ.get('ADMIN_EMAIL', '')
     admin_password = os.environ.get('ADMIN_PASSWORD', '')
     
@@ -97,6 +272,15 @@ async def startup_event():
             logger.info(f"Admin user created: {admin_email}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write out public project views still buffered in memory"""
+    try:
+        await flush_project_views()
+    except Exception as e:
+        logger.warning(f"Could not flush project views on shutdown: {e}")
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(app, host="0.0.0.0", port=8001, loop="uvloop", http="httptools")
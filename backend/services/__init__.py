@@ -5,12 +5,16 @@ from .auth import (
 from .email import (
     send_email, get_password_reset_email_html, get_daily_reminder_email_html, get_test_email_html
 )
-from .project import verify_project_access
+from .project import verify_project_access, forget_project_access
+from .response import response_row, response_rows
+from .search import search_regex
 from . import google_calendar
 
 __all__ = [
     "hash_password", "verify_password", "create_token", "get_current_user",
     "send_email", "get_password_reset_email_html", "get_daily_reminder_email_html", "get_test_email_html",
-    "verify_project_access",
+    "verify_project_access", "forget_project_access",
+    "response_row", "response_rows",
+    "search_regex",
     "google_calendar",
 ]
@@ -3,6 +3,7 @@ from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request as GoogleRequest
 from googleapiclient.discovery import build
 from datetime import datetime, timezone, timedelta
+import asyncio
 import requests
 from typing import Optional, Dict, Any
 import logging
@@ -78,7 +79,7 @@ async def refresh_credentials_if_needed(creds: Credentials, db, user_id: str) ->
     """Refresh credentials if expired and update in database."""
     if creds.expired and creds.refresh_token:
         try:
-            creds.refresh(GoogleRequest())
+            await asyncio.to_thread(creds.refresh, GoogleRequest())
             # Update stored tokens
             await db.users.update_one(
                 {"id": user_id},
@@ -169,7 +170,7 @@ def delete_calendar_event(service, event_id: str) -> bool:
 
 async def sync_task_to_calendar(db, user_id: str, task: Dict[str, Any]) -> Optional[str]:
     """Sync a task to Google Calendar. Returns the Google event ID."""
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "id": 1, "google_calendar": 1})
     if not user:
         return None
     
@@ -209,7 +210,9 @@ async def sync_task_to_calendar(db, user_id: str, task: Dict[str, Any]) -> Optio
         # Use existing google_event_id if available
         event_id = task.get("google_event_id")
         
-        result = create_calendar_event(
+        # The Google client is blocking; keep the event loop free while it talks to the API
+        result = await asyncio.to_thread(
+            create_calendar_event,
             service=service,
             summary=summary,
             start_time=start_time,
@@ -226,7 +229,7 @@ async def sync_task_to_calendar(db, user_id: str, task: Dict[str, Any]) -> Optio
 
 async def sync_routine_to_calendar(db, user_id: str, routine: Dict[str, Any], date: str) -> Optional[str]:
     """Sync a routine completion to Google Calendar."""
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "id": 1, "google_calendar": 1})
     if not user:
         return None
     
@@ -254,7 +257,8 @@ async def sync_routine_to_calendar(db, user_id: str, routine: Dict[str, Any], da
         summary = f"[Routine] {routine.get('name', 'Untitled')}"
         description = routine.get('description', '')
         
-        result = create_calendar_event(
+        result = await asyncio.to_thread(
+            create_calendar_event,
             service=service,
             summary=summary,
             start_time=start_time,
@@ -274,7 +278,7 @@ async def delete_task_from_calendar(db, user_id: str, google_event_id: str) -> b
     if not google_event_id:
         return False
     
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "id": 1, "google_calendar": 1})
     if not user:
         return False
     
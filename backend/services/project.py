@@ -1,11 +1,36 @@
 """Project services."""
 from fastapi import HTTPException
+import time
+
 from config import db
 
+# Confirmed ownership keyed by (project_id, user_id): key -> expires_at. Only the fact is cached,
+# never project fields; callers that copy fields (e.g. the name) read them fresh.
+# Deletes in this process drop their entry; other workers see them within PROJECT_ACCESS_TTL seconds.
+PROJECT_ACCESS_CACHE_SIZE = 4096
+PROJECT_ACCESS_TTL = 30
+_project_access_cache = {}
+
 
 async def verify_project_access(project_id: str, user_id: str):
     """Verify user has access to a project."""
-    project = await db.projects.find_one({"id": project_id, "user_id": user_id})
+    key = (project_id, user_id)
+    now = time.time()
+    expires_at = _project_access_cache.get(key)
+    if expires_at:
+        if expires_at > now:
+            return
+        del _project_access_cache[key]
+    
+    project = await db.projects.find_one({"id": project_id, "user_id": user_id}, {"_id": 1})
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    
+    if len(_project_access_cache) >= PROJECT_ACCESS_CACHE_SIZE:
+        _project_access_cache.pop(next(iter(_project_access_cache)))
+    _project_access_cache[key] = now + PROJECT_ACCESS_TTL
+
+
+def forget_project_access(project_id: str, user_id: str):
+    """Drop a cached project access check after the project changed or was deleted."""
+    _project_access_cache.pop((project_id, user_id), None)
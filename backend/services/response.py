@@ -0,0 +1,18 @@
+"""Response shaping services."""
+from typing import Iterable, List, Type
+
+from pydantic import BaseModel
+
+
+def response_row(model: Type[BaseModel], row: dict) -> dict:
+    """Shape a stored row the way response_model would: only the model's fields, defaults filled in."""
+    return {
+        name: row[name] if name in row else field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if name in row or not field.is_required()
+    }
+
+
+def response_rows(model: Type[BaseModel], rows: Iterable[dict]) -> List[dict]:
+    """Shape stored rows for list routes that return them without a response_model."""
+    return [response_row(model, row) for row in rows]
@@ -0,0 +1,7 @@
+"""Search services."""
+import re
+
+
+def search_regex(text: str) -> dict:
+    """Case-insensitive MongoDB filter matching the search text literally, never as a user-supplied pattern."""
+    return {"$regex": re.escape(text), "$options": "i"}
@@ -196,6 +196,62 @@ class TestFinanceCategories:
         assert data["name"] == "TEST_Custom Category"
         assert data["type"] == "expense"
         print(f"Created custom category: {data['name']}")
+    
+    def test_create_duplicate_category_name_fails(self):
+        """POST /api/finance/categories - Reusing a category name in the same project returns 400"""
+        headers = {"Authorization": f"Bearer {test_data['token']}"}
+        payload = {
+            "project_id": test_data["project_id"],
+            "name": "TEST_Custom Category",
+            "type": "income"
+        }
+        response = requests.post(f"{BASE_URL}/api/finance/categories", json=payload, headers=headers)
+        assert response.status_code == 400, f"Expected 400 for duplicate name, got {response.status_code}"
+        assert "already exists" in response.json().get("detail", "").lower()
+        print("Duplicate category name correctly rejected")
+    
+    def test_seed_adds_only_missing_defaults(self):
+        """POST /api/finance/categories/seed/{project_id} - Existing categories are kept, missing defaults added"""
+        headers = {"Authorization": f"Bearer {test_data['token']}"}
+        response = requests.post(
+            f"{BASE_URL}/api/projects",
+            json={"name": "TEST_Seed Project", "description": "Category seeding test"},
+            headers=headers
+        )
+        assert response.status_code == 200, f"Failed to create project: {response.text}"
+        project_id = response.json()["id"]
+        
+        try:
+            # One category that shares a default's name, one custom
+            for name in ("Food", "TEST_Seed Custom"):
+                response = requests.post(
+                    f"{BASE_URL}/api/finance/categories",
+                    json={"project_id": project_id, "name": name, "type": "expense"},
+                    headers=headers
+                )
+                assert response.status_code == 200, f"Failed to create category: {response.text}"
+            
+            response = requests.post(f"{BASE_URL}/api/finance/categories/seed/{project_id}", json={}, headers=headers)
+            assert response.status_code == 200, f"Failed to seed categories: {response.text}"
+            seeded = [c["name"] for c in response.json()["categories"]]
+            assert "Food" not in seeded, "Existing default was seeded again"
+            assert "Rent" in seeded
+            
+            response = requests.get(f"{BASE_URL}/api/finance/categories?project_id={project_id}", headers=headers)
+            names = [c["name"] for c in response.json()["categories"]]
+            assert len(names) == len(set(names)), f"Duplicate category names after seeding: {names}"
+            assert "TEST_Seed Custom" in names
+            
+            # Nothing left to add the second time
+            response = requests.post(f"{BASE_URL}/api/finance/categories/seed/{project_id}", json={}, headers=headers)
+            assert response.status_code == 400
+            assert "already exist" in response.json().get("detail", "").lower()
+            print(f"Seeded {len(seeded)} missing defaults next to existing categories")
+        finally:
+            response = requests.get(f"{BASE_URL}/api/finance/categories?project_id={project_id}", headers=headers)
+            for cat in response.json().get("categories", []):
+                requests.delete(f"{BASE_URL}/api/finance/categories/{cat['id']}", headers=headers)
+            requests.delete(f"{BASE_URL}/api/projects/{project_id}", headers=headers)
 
 
 class TestFinanceTransactions:
@@ -125,6 +125,12 @@ async def import_checklists(mongo_url: str, db_name: str, project_id: str, user_
     client = AsyncIOMotorClient(mongo_url)
     db = client[db_name]
     
+    project = await db.projects.find_one({"id": project_id, "user_id": user_id}, {"_id": 0, "name": 1})
+    if not project:
+        print(f"❌ Project {project_id} not found for user {user_id}. Run with --list-projects to find it.")
+        client.close()
+        return
+    
     now = datetime.now(timezone.utc).isoformat()
     total_items = 0
     
@@ -139,8 +145,11 @@ async def import_checklists(mongo_url: str, db_name: str, project_id: str, user_
             "id": checklist_id,
             "project_id": project_id,
             "user_id": user_id,
+            "project_name": project["name"],
             "name": checklist_data["name"],
             "description": checklist_data["description"],
+            # The API appends items after next_order, so seed it with the highest order imported below
+            "next_order": max(len(checklist_data["items"]) - 1, 0),
             "created_at": now,
             "updated_at": now
         }